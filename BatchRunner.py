@@ -0,0 +1,129 @@
+"""
+-------------------------------------------------------------------------------
+Author(s): Rahi Krishna (rk4748), Tanmay G. Dadhania (tgd8275)
+Date: October 16, 2026
+
+Description:
+This file runs whole directories (or glob patterns) of trace files in a pool of worker processes.
+Each trace gets its own TransactionManager, built from the flags of its options comment (see Main.trace_options);
+its output is written to <output_dir>/<trace name>.out, exactly as a single `python Main.py <trace>` run would
+print it. Trace names are paths relative to the deepest directory holding all the traces, so traces with the same
+file name in different directories get output files of their own. A summary of wall time, commits, aborts, site failures and
+line errors is printed for every trace once the batch finishes.
+-------------------------------------------------------------------------------
+"""
+
+import os
+import io
+import sys
+import glob
+import time
+import argparse
+from contextlib import redirect_stdout, redirect_stderr
+from concurrent.futures import ProcessPoolExecutor
+
+from Main import Main
+
+
+class BatchRunner:
+    @staticmethod
+    def collect_traces(paths):
+        """
+        Expand directories and glob patterns into a sorted list of trace files.
+        A directory contributes every .txt file directly inside it.
+        """
+        traces = []
+        for path in paths:
+            if os.path.isdir(path):
+                traces.extend(glob.glob(os.path.join(path, "*.txt")))
+            elif glob.has_magic(path):
+                traces.extend(glob.glob(path))
+            else:
+                traces.append(path)
+        return sorted(set(traces))
+
+    @staticmethod
+    def trace_names(traces):
+        """
+        Return the name of every trace: its path relative to the deepest directory that holds all the traces.
+        """
+        paths = [os.path.abspath(trace) for trace in traces]
+        root = os.path.commonpath([os.path.dirname(path) for path in paths]) if paths else ""
+        return [os.path.relpath(path, root) for path in paths]
+
+    @staticmethod
+    def run_trace(trace, name, output_dir):
+        """
+        Run one trace with an isolated TransactionManager, configured by the trace's options, and write its output
+        file under the trace's name.
+        Returns a summary dict for the trace.
+        """
+        stdout, stderr = io.StringIO(), io.StringIO()
+
+        start = time.perf_counter()
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            args = Main.argument_parser().parse_args(Main.trace_options(trace) + [trace])
+            transaction_manager = Main.main(trace, Main.build_transaction_manager(args))
+            transaction_manager.close()
+        wall_time = time.perf_counter() - start
+
+        output_path = os.path.join(output_dir, f"{name}.out")
+        os.makedirs(os.path.dirname(output_path), exist_ok = True)
+        with open(output_path, "w") as output:
+            output.write(stdout.getvalue())
+
+        return {
+            "trace": name,
+            "wall_time": wall_time,
+            "commits": transaction_manager.stats["commits"],
+            "aborts": transaction_manager.stats["aborts"],
+            "failures": transaction_manager.stats["failures"],
+            "errors": len(stderr.getvalue().splitlines()),
+        }
+
+    @staticmethod
+    def run(traces, output_dir, workers=None):
+        """
+        Run all traces in a process pool and return their summaries in trace order.
+        """
+        os.makedirs(output_dir, exist_ok = True)
+        with ProcessPoolExecutor(max_workers = workers) as pool:
+            return list(pool.map(BatchRunner.run_trace, traces, BatchRunner.trace_names(traces),
+                                 [output_dir] * len(traces)))
+
+    @staticmethod
+    def print_summary(summaries, total_time):
+        """
+        Print one line per trace and a total line.
+        """
+        width = max([len("trace")] + [len(summary["trace"]) for summary in summaries])
+        print(f"{'trace':<{width}}  {'time (s)':>9}  {'commits':>7}  {'aborts':>6}  {'failures':>8}  {'errors':>6}")
+        for summary in summaries:
+            print(f"{summary['trace']:<{width}}  {summary['wall_time']:>9.4f}  {summary['commits']:>7}  "
+                  f"{summary['aborts']:>6}  {summary['failures']:>8}  {summary['errors']:>6}")
+        print(f"{len(summaries)} traces in {total_time:.4f}s: "
+              f"{sum(summary['commits'] for summary in summaries)} commits, "
+              f"{sum(summary['aborts'] for summary in summaries)} aborts, "
+              f"{sum(summary['failures'] for summary in summaries)} failures")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Run trace files in parallel")
+    parser.add_argument(
+        "paths",
+        nargs = "*",
+        default = ["tests"],
+        help = "Trace files, directories or glob patterns (default: tests)"
+    )
+    parser.add_argument("--output-dir", default = "outputs", help = "Directory for the .out files (default: outputs)")
+    parser.add_argument("--workers", type = int, default = None, help = "Number of worker processes (default: CPUs)")
+    args = parser.parse_args()
+
+    traces = BatchRunner.collect_traces(args.paths)
+    if not traces:
+        print("No trace files found.", file = sys.stderr)
+        sys.exit(1)
+
+    batch_start = time.perf_counter()
+    results = BatchRunner.run(traces, args.output_dir, args.workers)
+    BatchRunner.print_summary(results, time.perf_counter() - batch_start)
@@ -0,0 +1,252 @@
+"""
+-------------------------------------------------------------------------------
+Author(s): Rahi Krishna (rk4748), Tanmay G. Dadhania (tgd8275)
+Date: October 16, 2026
+
+Description:
+This file benchmarks the TransactionManager on a trace file or on a workload generated on the fly.
+Commands are driven directly through Main's parser and dispatch table with output counted rather than printed;
+consecutive end commands form a commit group, as they do in Main. The benchmark reports throughput (commands/sec),
+per-command latency percentiles, transaction latency (timestamps from begin to commit, which includes lock waits),
+aborted transactions by cause and peak memory. Results are saved as JSON so
+runs can be compared across versions and across concurrency-control engines (--engine).
+-------------------------------------------------------------------------------
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+from functools import partial
+
+from Main import Main, COMMAND_HANDLERS, ENGINES
+from EventSink import CounterSink
+from TransactionManager import TransactionManager
+from WorkloadGenerator import WorkloadGenerator
+
+
+class LatencySink(CounterSink):
+    """
+    CounterSink that also measures how many timestamps every committed transaction took from begin to commit.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.timestamp = 0      # Timestamp of the command being executed
+        self.begun = {}         # transaction_id -> begin timestamp
+        self.latencies = []
+
+    def emit(self, event, **fields):
+        super().emit(event, **fields)
+        if event == "begin":
+            self.begun[fields["transaction_id"]] = fields["timestamp"]
+        elif event == "commit":
+            start = self.begun.pop(fields["transaction_id"], None)
+            if start is not None:
+                self.latencies.append(self.timestamp - start)
+
+
+class Benchmark:
+    @staticmethod
+    def percentile(sorted_samples, fraction):
+        """
+        Return the given percentile (0..1) of an already sorted list using the nearest-rank method.
+        """
+        if not sorted_samples:
+            return 0
+        rank = max(0, min(len(sorted_samples) - 1, round(fraction * len(sorted_samples)) - 1))
+        return sorted_samples[rank]
+
+    @staticmethod
+    def execute(commands, transaction_manager, latencies=None):
+        """
+        Run parsed commands as Main.execute does, with consecutive end commands forming one commit group, but
+        ignore errors. With latencies (command -> list), every command's handler is timed in microseconds, and
+        the sink is told the timestamp of the command it runs.
+        """
+        clock = time.perf_counter_ns
+        timestamp = 0
+        in_commit_group = False
+        for timestamp, (line_number, command, args) in enumerate(commands, start = 1):
+            if command == "end" and not in_commit_group:
+                transaction_manager.begin_commit_group()
+                in_commit_group = True
+            elif command != "end" and in_commit_group:
+                transaction_manager.end_commit_group(timestamp - 1)
+                in_commit_group = False
+            transaction_manager.tick(timestamp)
+
+            handler = COMMAND_HANDLERS.get(command)
+            if handler is None:
+                continue
+            if latencies is not None:
+                transaction_manager.sink.timestamp = timestamp
+            before = clock()
+            try:
+                handler(transaction_manager, args, timestamp)
+            except Exception:
+                pass
+            if latencies is not None:
+                latencies.setdefault(command, []).append((clock() - before) / 1000)
+        if in_commit_group:
+            transaction_manager.end_commit_group(timestamp)
+
+    @staticmethod
+    def run(lines, transaction_manager_factory=TransactionManager):
+        """
+        Execute the trace lines once for timing and once under tracemalloc for peak memory.
+        Returns the result dict.
+        """
+        commands = list(Main.parse(lines))
+
+        # Timing pass
+        sink = LatencySink()
+        transaction_manager = transaction_manager_factory(sink = sink)
+        latencies = {}  # command -> list of latencies in microseconds
+        clock = time.perf_counter_ns
+
+        start = clock()
+        Benchmark.execute(commands, transaction_manager, latencies)
+        wall_time = (clock() - start) / 1e9
+
+        # Memory pass
+        tracemalloc.start()
+        Benchmark.execute(commands, transaction_manager_factory(sink = CounterSink()))
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        begun = sink.counts.get("begin", 0)
+        aborted = transaction_manager.stats["aborts"]
+        latency_report = {}
+        for command, samples in latencies.items():
+            samples.sort()
+            latency_report[command] = {
+                "count": len(samples),
+                "p50_us": Benchmark.percentile(samples, 0.50),
+                "p90_us": Benchmark.percentile(samples, 0.90),
+                "p99_us": Benchmark.percentile(samples, 0.99),
+                "max_us": samples[-1],
+            }
+
+        transaction_latencies = sorted(sink.latencies)
+
+        return {
+            "commands": len(commands),
+            "wall_time_s": wall_time,
+            "ops_per_sec": len(commands) / wall_time if wall_time else 0,
+            "transactions": begun,
+            "commits": transaction_manager.stats["commits"],
+            "aborts_by_cause": dict(transaction_manager.abort_reasons),  # Aborted transactions, by the first cause
+            "abort_rate": aborted / begun if begun else 0,
+            "latency": latency_report,
+            "transaction_latency": {
+                "p50": Benchmark.percentile(transaction_latencies, 0.50),
+                "p90": Benchmark.percentile(transaction_latencies, 0.90),
+                "p99": Benchmark.percentile(transaction_latencies, 0.99),
+                "max": transaction_latencies[-1] if transaction_latencies else 0,
+            },
+            "peak_memory_bytes": peak_memory,
+        }
+
+    @staticmethod
+    def print_report(result, baseline=None):
+        """
+        Print a result, with relative changes against a baseline result if one is given.
+        """
+        def change(key, value):
+            if not baseline or not baseline.get(key):
+                return ""
+            return f"  ({(value - baseline[key]) / baseline[key]:+.1%} vs baseline)"
+
+        print(f"commands:    {result['commands']}")
+        print(f"wall time:   {result['wall_time_s']:.4f}s")
+        print(f"throughput:  {result['ops_per_sec']:.0f} commands/sec{change('ops_per_sec', result['ops_per_sec'])}")
+        print(f"peak memory: {result['peak_memory_bytes'] / 1024:.1f} KiB"
+              f"{change('peak_memory_bytes', result['peak_memory_bytes'])}")
+        print(f"commits:     {result['commits']} of {result['transactions']} transactions")
+        print(f"abort rate:  {result['abort_rate']:.1%}")
+        transaction_latency = result.get("transaction_latency")
+        if transaction_latency:
+            print(f"txn latency: p50 {transaction_latency['p50']}, p90 {transaction_latency['p90']}, "
+                  f"p99 {transaction_latency['p99']}, max {transaction_latency['max']} timestamps")
+        for cause, count in sorted(result["aborts_by_cause"].items()):
+            print(f"  {cause}: {count}")
+        print(f"{'command':<8}  {'count':>8}  {'p50 us':>9}  {'p90 us':>9}  {'p99 us':>9}  {'max us':>9}")
+        for command, stats in sorted(result["latency"].items()):
+            print(f"{command:<8}  {stats['count']:>8}  {stats['p50_us']:>9.1f}  {stats['p90_us']:>9.1f}  "
+                  f"{stats['p99_us']:>9.1f}  {stats['max_us']:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Benchmark the transaction manager")
+    parser.add_argument("trace", nargs = "?", help = "Trace file to run (default: generate a workload)")
+    parser.add_argument("--label", default = "run", help = "Name of the result file (default: run)")
+    parser.add_argument("--results-dir", default = "benchmarks", help = "Directory for results (default: benchmarks)")
+    parser.add_argument("--compare", help = "Result JSON file to compare against")
+    parser.add_argument("--transactions", type = int, default = 1000, help = "Generated transactions")
+    parser.add_argument("--concurrency", type = int, default = 10, help = "Generated concurrent transactions")
+    parser.add_argument("--length", type = float, default = 5, help = "Mean reads/writes per transaction")
+    parser.add_argument("--read-ratio", type = float, default = 0.7, help = "Fraction of operations that are reads")
+    parser.add_argument("--zipf", type = float, default = 0.0, help = "Zipf skew of variable accesses")
+    parser.add_argument("--read-only", type = float, default = 0.0, help = "Fraction of read-only transactions")
+    parser.add_argument("--failure-rate", type = float, default = 0.0, help = "Per-command site failure probability")
+    parser.add_argument("--recovery-rate", type = float, default = 0.2, help = "Per-command site recovery probability")
+    parser.add_argument("--seed", type = int, default = 0, help = "Random seed for the generated workload")
+    parser.add_argument("--gc", action = "store_true", help = "Enable garbage collection of finished transactions")
+    parser.add_argument("--engine", choices = sorted(ENGINES), default = "ssi",
+                        help = "Concurrency control engine (default: ssi)")
+    parser.add_argument("--anti-entropy", type = int, default = 0,
+                        help = "Variables copied per tick from peers to a recovered site (default: 0, off)")
+    eager_validation_modes = {mode for engine in ENGINES.values() for mode in engine.EAGER_VALIDATION_MODES}
+    parser.add_argument("--eager-validation", choices = sorted(eager_validation_modes), default = None,
+                        help = "Check writes against the commit rules when they happen (default: off)")
+    parser.add_argument("--read-cache", type = int, default = 256,
+                        help = "Snapshot reads cached per transaction (default: 256, 0: off)")
+    args = parser.parse_args()
+    if args.eager_validation not in (None,) + ENGINES[args.engine].EAGER_VALIDATION_MODES:
+        parser.error(f"--eager-validation {args.eager_validation} is not supported by the {args.engine} engine")
+
+    if args.trace:
+        with open(args.trace) as trace_file:
+            trace_lines = trace_file.readlines()
+        workload = {"trace": args.trace}
+    else:
+        generator = WorkloadGenerator(
+            args.transactions, args.concurrency, args.length, args.read_ratio, args.zipf,
+            read_only_share = args.read_only, failure_rate = args.failure_rate, recovery_rate = args.recovery_rate,
+            seed = args.seed
+        )
+        trace_lines = list(generator.generate())
+        workload = {key: value for key, value in vars(args).items()
+                    if key not in ("trace", "label", "results_dir", "compare", "gc", "engine", "anti_entropy",
+                                   "eager_validation", "read_cache")}
+    workload["gc"] = args.gc
+    workload["engine"] = args.engine
+    workload["anti_entropy"] = args.anti_entropy
+    workload["eager_validation"] = args.eager_validation
+    workload["read_cache"] = args.read_cache
+
+    benchmark_result = Benchmark.run(trace_lines, partial(ENGINES[args.engine], gc_enabled = args.gc,
+                                                          anti_entropy_batch = args.anti_entropy,
+                                                          eager_validation = args.eager_validation,
+                                                          read_cache_size = args.read_cache))
+    benchmark_result["label"] = args.label
+    benchmark_result["workload"] = workload
+    benchmark_result["python"] = platform.python_version()
+    benchmark_result["timestamp"] = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+    baseline_result = None
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline_result = json.load(baseline_file)
+
+    Benchmark.print_report(benchmark_result, baseline_result)
+
+    os.makedirs(args.results_dir, exist_ok = True)
+    result_path = os.path.join(args.results_dir, f"{args.label}.json")
+    with open(result_path, "w") as result_file:
+        json.dump(benchmark_result, result_file, indent = 2)
+    print(f"Results saved to {result_path}", file = sys.stderr)
@@ -10,74 +10,220 @@ recovery mechanisms for distributed data replication.
 -------------------------------------------------------------------------------
 """
 
+from array import array
+from bisect import bisect_right
+
+from PlacementCatalog import PlacementCatalog
+from WriteAheadLog import WriteAheadLog
+
+
 class DataManager:
-    def __init__(self, site_id):
+    def __init__(self, site_id, catalog=None, wal_options=None):
         self.site_id = site_id
+        self.catalog = catalog if catalog is not None else PlacementCatalog()  # Used to tell replicated variables apart
         self.variables = {}  # Tracks current committed values: variable -> value
         self.status = "up"  # Current status of the site: "up" or "down"
-        self.version_history = {}  # Tracks version history: variable -> list of [value, commit_time]
+        self.version_values = {}  # Version chains: variable -> array of values, sorted by commit time
+        self.version_times = {}  # Commit times of each version chain: variable -> array, parallel to version_values
         self.committed_after_recovery = set()  # Tracks variables committed to after recovery
+        self.wal = None  # Write-ahead log of this site, if its state is durable
 
-    def read(self, variable, start_time):
+        if wal_options is not None:
+            self.open_log(WriteAheadLog(site_id = site_id, **wal_options))
+
+    def open_log(self, wal):
         """
-        Return the value of a variable for a transaction's snapshot.
-        A transaction sees the most recent version committed before its start time.
+        Restore the site from its last checkpoint and the log records after it, then log every later change.
+        """
+        state, records = wal.load()
+        if state is not None:
+            self.status = state["status"]
+            self.committed_after_recovery = set(state["committed_after_recovery"])
+            for variable, (values, times) in state["versions"].items():
+                self.version_values[variable] = array("q", values)
+                self.version_times[variable] = array("q", times)
+                self.variables[variable] = values[-1]
+
+        for record in records:
+            kind = record[1]
+            if kind == "W":
+                self.write(*record[2:])
+            elif kind == "F":
+                self.fail()
+            else:
+                self.recover()
+
+        self.wal = wal
+
+    def checkpoint(self):
+        """
+        Write the whole state of the site to its checkpoint, so a restart replays only the records after it.
+        """
+        self.wal.checkpoint({
+            "status": self.status,
+            "versions": {variable: [values.tolist(), self.version_times[variable].tolist()]
+                         for variable, values in self.version_values.items()},
+            "committed_after_recovery": sorted(self.committed_after_recovery),
+        })
+
+    def commit_log(self):
+        """
+        Mark the end of one transaction's changes in the log, checkpointing when enough records have accumulated.
+        """
+        if self.wal is not None:
+            self.wal.commit()
+            if self.wal.needs_checkpoint():
+                self.checkpoint()
+
+    def sync_log(self):
+        """
+        Force the log records of the commits not yet on disk to disk.
+        """
+        if self.wal is not None:
+            self.wal.sync_group()
+
+    def close(self):
+        """
+        Force the log to disk and close it.
+        """
+        if self.wal is not None:
+            self.wal.close()
+
+    @property
+    def version_history(self):
+        """
+        Return the version chains as variable -> list of (value, commit_time), sorted by time.
+        Built on demand for reports; the site itself stores each chain as two arrays of 64-bit integers.
+        """
+        return {variable: list(zip(values, self.version_times[variable]))
+                for variable, values in self.version_values.items()}
+
+    def version_chains(self, variables):
+        """
+        Return the version chains of the given variables as variable -> list of (value, commit_time), sorted by time.
+        Unlike reads, this works while the site is down.
+        """
+        return {variable: list(zip(self.version_values[variable], self.version_times[variable]))
+                for variable in variables if variable in self.version_values}
+
+    def read_version(self, variable, start_time):
+        """
+        Return the (value, commit_time) of the version a transaction's snapshot sees.
+        A transaction sees the most recent version committed before its start time, found by binary search.
         Reads are permitted only if the site is up and a write has been committed
         to the variable after recovery (if applicable).
         """
         if self.status != "up":
             raise Exception(f"Site {self.site_id} is down, cannot read {variable}.")
-        if variable not in self.version_history:
+        if variable not in self.version_values:
             raise Exception(f"Variable {variable} not found at Site {self.site_id}.")
         # if variable not in self.committed_after_recovery:
         #    raise Exception(f"Variable {variable} has not been committed to after recovery at Site {self.site_id}.")
 
         # Find the most recent version committed before start_time
-        for value, commit_time in reversed(self.version_history[variable]):
-            if commit_time <= start_time:
-                return value
+        times = self.version_times[variable]
+        index = bisect_right(times, start_time) - 1
+        if index >= 0:
+            return self.version_values[variable][index], times[index]
 
         raise Exception(f"No valid version of {variable} found at Site {self.site_id} for start_time {start_time}.")
 
-    def get_last_commit(self, variable, start_time):
+    def values_as_of(self, variables, timestamp):
+        """
+        Return the value each variable had at a timestamp (its newest version committed at or before it), or None
+        where that version is no longer kept. Unlike reads, this works while the site is down.
+        """
+        values = []
+        for variable in variables:
+            times = self.version_times.get(variable)
+            index = bisect_right(times, timestamp) - 1 if times else -1
+            values.append(self.version_values[variable][index] if index >= 0 else None)
+        return values
+
+    def read(self, variable, start_time):
         """
         Return the value of a variable for a transaction's snapshot.
-        A transaction sees the most recent version committed before its start time.
-        Reads are permitted only if the site is up and a write has been committed
-        to the variable after recovery (if applicable).
         """
-        if self.status != "up":
-            raise Exception(f"Site {self.site_id} is down, cannot read {variable}.")
-        if variable not in self.version_history:
-            raise Exception(f"Variable {variable} not found at Site {self.site_id}.")
-        # if variable not in self.committed_after_recovery:
-        #    raise Exception(f"Variable {variable} has not been committed to after recovery at Site {self.site_id}.")
+        return self.read_version(variable, start_time)[0]
 
-        # Find the most recent version committed before start_time
-        for value, commit_time in reversed(self.version_history[variable]):
-            if commit_time <= start_time:
-                return commit_time
+    def get_last_commit(self, variable, start_time):
+        """
+        Return the commit time of the version a transaction's snapshot sees.
+        Unlike reads, this works while the site is down, so a read can tell whether it may wait for the site.
+        """
+        times = self.version_times.get(variable)
+        index = bisect_right(times, start_time) - 1 if times else -1
+        if index < 0:
+            raise Exception(f"No valid version of {variable} found at Site {self.site_id} for start_time {start_time}.")
+        return times[index]
 
-        raise Exception(f"No valid version of {variable} found at Site {self.site_id} for start_time {start_time}.")
+    def latest_commit_time(self, variable):
+        """
+        Return the commit time of the newest version of a variable, or None if the site does not store it.
+        """
+        times = self.version_times.get(variable)
+        return times[-1] if times else None
 
-    def write(self, variable, value, commit_time):
+    def write(self, variable, value, commit_time, gc_watermark=None):
         """
         Write a new value to a variable.
         The new version is added to the version history, and the variable
         is marked as committed after recovery.
+        If gc_watermark is given, versions of this variable that no snapshot at or after it can see are dropped.
         """
         if self.status != "up":
             raise Exception(f"Site {self.site_id} is down, cannot write to {variable}.")
+        if self.wal is not None:
+            self.wal.append("W", variable, value, commit_time, gc_watermark)
+
+        if variable not in self.version_values:
+            self.version_values[variable] = array("q")
+            self.version_times[variable] = array("q")
+
+        values = self.version_values[variable]
+        times = self.version_times[variable]
 
-        if variable not in self.version_history:
-            self.version_history[variable] = []
+        # Append the new version to the history, keeping the chain sorted by commit time
+        if not times or times[-1] <= commit_time:
+            values.append(value)
+            times.append(commit_time)
+        else:
+            index = bisect_right(times, commit_time)
+            values.insert(index, value)
+            times.insert(index, commit_time)
+            value = values[-1]  # The current value is still the newest version
+
+        if gc_watermark is not None:
+            self.collect_versions(variable, gc_watermark)
 
-        # Append the new version to the history
-        self.version_history[variable].append([value, commit_time])
         self.variables[variable] = value  # Update the current value
         self.committed_after_recovery.add(variable)  # Mark as committed after recovery
         # print(f"Wrote {variable} = {value} at Site {self.site_id} with commit_time {commit_time}.")
 
+    def write_batch(self, writes, gc_watermark=None):
+        """
+        Apply a list of (variable, value, commit_time) writes, as one commit sends them to this site.
+        """
+        for variable, value, commit_time in writes:
+            self.write(variable, value, commit_time, gc_watermark)
+        self.commit_log()
+
+    def collect_versions(self, variable, watermark):
+        """
+        Drop the versions of a variable that are older than the newest version committed at or before watermark.
+        No transaction starting at or after watermark can read them. Returns the number of versions dropped.
+        """
+        times = self.version_times.get(variable)
+        if not times:
+            return 0
+
+        obsolete = bisect_right(times, watermark) - 1
+        if obsolete > 0:
+            del self.version_values[variable][:obsolete]
+            del times[:obsolete]
+            return obsolete
+        return 0
+
     def fail(self):
         """
         Simulate a site failure.
@@ -88,17 +234,22 @@ class DataManager:
         self.committed_after_recovery.clear()  # Clear tracking for replicated variables
 
         # Retain only the last committed entry in the version history
-        for variable, history in self.version_history.items():
-            if history:
+        for variable, values in self.version_values.items():
+            if values:
                 # Keep only the last committed entry
-                self.version_history[variable] = [history[-1]]  # Clear the committed-after-recovery tracker
+                del values[:-1]
+                del self.version_times[variable][:-1]
         # print(f"Site {self.site_id} has failed.")
 
+        if self.wal is not None:
+            self.wal.append("F")
+            self.commit_log()
+
     def recover(self):
         """
         Simulate a site recovery.
-        - Non-replicated variables (odd-numbered) are tracked for availability.
-        - Replicated variables (even-numbered) are immediately available for writes but not reads
+        - Non-replicated variables are tracked for availability.
+        - Replicated variables are immediately available for writes but not reads
         until consistency is re-established.
         """
         self.status = "up"
@@ -106,9 +257,11 @@ class DataManager:
 
         # Update the availability of variables
         for variable in self.variables:
-            variable_index = int(variable[1:])  # Extract the numeric part of the variable name
-
-            if variable_index % 2 != 0:
-                # Non-replicated (odd-numbered) variables: require tracking for reads after recovery
+            if not self.catalog.is_replicated(variable):
+                # Non-replicated variables: require tracking for reads after recovery
                 if variable not in self.committed_after_recovery:
                     self.committed_after_recovery.add(variable)  # Add to post-recovery tracking
+
+        if self.wal is not None:
+            self.wal.append("R")
+            self.commit_log()
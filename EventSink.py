@@ -0,0 +1,188 @@
+"""
+-------------------------------------------------------------------------------
+Author(s): Rahi Krishna (rk4748), Tanmay G. Dadhania (tgd8275)
+Date: October 16, 2026
+
+Description:
+This file defines the event sinks the TransactionManager reports to instead of printing directly.
+Every operation emits a named event with its fields; the sink decides how (and whether) to render it:
+- TextSink buffers the same text lines the system has always printed, byte for byte.
+- JsonLinesSink writes one JSON object per event.
+- CounterSink only counts events and prints the totals when closed.
+Expensive events (serialization graph and state dumps) are only built when the sink wants them.
+-------------------------------------------------------------------------------
+"""
+
+import sys
+import json
+
+
+class EventSink:
+    LAZY_EVENTS = ("graph", "dump")  # Events whose payload is costly to build
+
+    def __init__(self, stream=None, buffer_size=4096):
+        self.stream = stream            # Output stream; None means sys.stdout at flush time
+        self.buffer = []                # Rendered output waiting to be written
+        self.buffer_size = buffer_size  # Number of buffered entries that triggers a flush
+        self.before_flush = None        # Called before buffered output is written (e.g., to force logs to disk)
+
+    def wants(self, event):
+        """
+        Return True if the sink renders the given event, so the caller knows whether to build its payload.
+        """
+        return True
+
+    def emit(self, event, **fields):
+        """
+        Record an event. The base sink ignores everything.
+        """
+
+    def write(self, text):
+        """
+        Buffer rendered text and flush once the buffer is full.
+        """
+        self.buffer.append(text)
+        if len(self.buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the buffered output to the stream.
+        """
+        if self.buffer:
+            if self.before_flush is not None:
+                self.before_flush()
+            stream = self.stream if self.stream is not None else sys.stdout
+            stream.write("".join(self.buffer))
+            self.buffer.clear()
+            stream.flush()
+
+    def close(self):
+        """
+        Flush the remaining output at the end of a run.
+        """
+        self.flush()
+
+
+class TextSink(EventSink):
+    TEMPLATES = {
+        "begin": "Starting {read_only_prefix}transaction T{transaction_id} at timestamp {timestamp}.\n",
+        "read": "Transaction T{transaction_id} read {variable}:{value} from Site {site_id}.\n",
+        "abort_no_valid_site": "Transaction T{transaction_id} aborted: "
+                               "No valid site could provide the value for {variable}.\n",
+        "abort_first_committer_wins": "Transaction T{transaction_id} aborted: {variable} was committed at "
+                                      "{commit_time}, after transaction start time {start_time}.\n",
+        "abort_failure_timestamp": "Transaction T{transaction_id} aborted: Write timestamp {write_timestamp} for "
+                                   "{variable} precedes failure timestamp {failure_timestamp} on Site {site_id}.\n",
+        "write": "Transaction T{transaction_id} wrote {variable} to sites: {sites_text}\n",
+        "doomed": "Transaction T{transaction_id} would be aborted if it committed now ({reason_text}).\n",
+        "doom_lifted": "Transaction T{transaction_id} would no longer be aborted at commit.\n",
+        "abort_cycle":"Cycle with consecutive RW edges detected! Transaction T{transaction_id} aborted.\n",
+        "commit": "Transaction T{transaction_id} has been committed.\n",
+        "recover": "Site {site_id} has been recovered.\n",
+        "catch_up": "Site {site_id} caught up {variables_text} from its peers.\n",
+        "wait_lock": "Transaction T{transaction_id} is waiting for {blockers_text} to release {variable}.\n",
+        "wait_site": "Transaction T{transaction_id} is waiting for a site with {variable} to recover.\n",
+        "read_own_write": "Transaction T{transaction_id} read {variable}:{value} from its own write.\n",
+        "abort_deadlock": "Deadlock detected among {cycle_text}! Transaction T{transaction_id} aborted.\n",
+        "abort_site_failure": "Transaction T{transaction_id} aborted: Site {site_id} failed at {failure_timestamp}, "
+                              "after the transaction accessed it at {access_time}.\n",
+        "read_recovered": "Transaction T{transaction_id} read {variable}:{value} from recovered Site {site_id}.\n",
+        "read_recovered_failed": "Transaction T{transaction_id} failed to read {variable} "
+                                 "from recovered Site {site_id}: {error}\n",
+    }
+
+    def emit(self, event, **fields):
+        if event == "graph":
+            self.write_graph(fields["graph"])
+        elif event == "dump":
+            self.write_dump(fields["sites"], fields.get("as_of"), fields.get("delta"))
+        elif event in self.TEMPLATES:
+            if event == "begin":
+                fields["read_only_prefix"] = "read-only " if fields["read_only"] else ""
+            elif event == "write":
+                fields["sites_text"] = ", ".join(map(str, fields["sites"]))
+            elif event == "catch_up":
+                fields["variables_text"] = ", ".join(fields["variables"])
+            elif event == "wait_lock":
+                fields["blockers_text"] = ", ".join(f"T{tid}" for tid in fields["blockers"])
+            elif event == "doomed":
+                fields["reason_text"] = fields["reason"].replace("_", " ")
+            elif event == "abort_deadlock":
+                fields["cycle_text"] = ", ".join(f"T{tid}" for tid in fields["cycle"])
+            self.write(self.TEMPLATES[event].format(**fields))
+
+    def write_graph(self, graph):
+        """
+        Render the serialization graph, unless it has no edges. The types of an edge are listed in sorted order.
+        """
+        lines = [
+            f"T{from_tid} -[{','.join(sorted(edge_types))}]-> T{to_tid}\n"
+            for from_tid, edges in graph.items()
+            for to_tid, edge_types in edges.items()
+        ]
+        if lines:
+            self.write("\n--- Serialization Graph ---\n" + "".join(lines) + "----------------------------\n")
+
+    def write_dump(self, sites, as_of=None, delta=False):
+        """
+        Render a state dump: one line per site with its variables in order.
+        """
+        if delta:
+            lines = ["\n--- Dump State (changes since last delta dump) ---\n"]
+        elif as_of is not None:
+            lines = [f"\n--- Dump State as of timestamp {as_of} ---\n"]
+        else:
+            lines = ["\n--- Dump State ---\n"]
+        for site_id, status, variables in sites:
+            site_data = ", ".join(f"{var}: {val}" for var, val in variables)
+            if status == "down":
+                lines.append(f"site {site_id} (down) – {site_data}\n")
+            else:
+                lines.append(f"site {site_id} – {site_data}\n")
+        lines.append("--------------------\n")
+        self.write("".join(lines))
+
+
+class JsonLinesSink(EventSink):
+    def emit(self, event, **fields):
+        if event == "graph":
+            edges = [
+                [from_tid, to_tid, sorted(edge_types)]
+                for from_tid, edges in fields["graph"].items()
+                for to_tid, edge_types in edges.items()
+            ]
+            if not edges:
+                return
+            fields = {"edges": edges}
+        elif event == "dump":
+            dump = {"sites": [
+                {"site_id": site_id, "status": status, "variables": dict(variables)}
+                for site_id, status, variables in fields["sites"]
+            ]}
+            if fields.get("as_of") is not None:
+                dump["as_of"] = fields["as_of"]
+            if fields.get("delta"):
+                dump["delta"] = True
+            fields = dump
+        self.write(json.dumps({"event": event, **fields}, default = str) + "\n")
+
+
+class CounterSink(EventSink):
+    def __init__(self, stream=None):
+        super().__init__(stream)
+        self.counts = {}  # event -> number of times it was emitted
+
+    def wants(self, event):
+        return event not in self.LAZY_EVENTS
+
+    def emit(self, event, **fields):
+        self.counts[event] = self.counts.get(event, 0) + 1
+
+    def close(self):
+        for event, count in sorted(self.counts.items()):
+            self.write(f"{event}: {count}\n")
+        self.flush()
+
+
+SINKS = {"text": TextSink, "jsonl": JsonLinesSink, "quiet": CounterSink}
@@ -0,0 +1,219 @@
+"""
+-------------------------------------------------------------------------------
+Author(s): Rahi Krishna (rk4748), Tanmay G. Dadhania (tgd8275)
+Date: October 16, 2026
+
+Description:
+This file implements opt-in instrumentation for the TransactionManager and its DataManagers.
+attach() wraps the hot methods of one TransactionManager instance (commit, read_intention, cycle detection,
+DataManager reads, ...) with timers, and samples the serialization graph size and wait-queue depth after every
+commit. Nothing is wrapped unless attach() is called, so a run without instrumentation pays no overhead at all.
+Results are available as a snapshot dict and as a text report; abort reasons come from the TransactionManager.
+-------------------------------------------------------------------------------
+"""
+
+import time
+import random
+
+
+class Timer:
+    def __init__(self, sample_limit, rng):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.samples = []                   # Reservoir of durations used for percentiles
+        self.sample_limit = sample_limit
+        self.rng = rng
+
+    def record(self, duration_ns):
+        self.count += 1
+        self.total_ns += duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+
+        # Reservoir sampling keeps memory bounded on long runs
+        if len(self.samples) < self.sample_limit:
+            self.samples.append(duration_ns)
+        else:
+            slot = self.rng.randrange(self.count)
+            if slot < self.sample_limit:
+                self.samples[slot] = duration_ns
+
+    def summary(self):
+        samples = sorted(self.samples)
+
+        def percentile(fraction):
+            if not samples:
+                return 0
+            return samples[max(0, min(len(samples) - 1, round(fraction * len(samples)) - 1))] / 1000
+
+        return {
+            "count": self.count,
+            "total_ms": self.total_ns / 1e6,
+            "mean_us": self.total_ns / self.count / 1000 if self.count else 0,
+            "p50_us": percentile(0.50),
+            "p90_us": percentile(0.90),
+            "p99_us": percentile(0.99),
+            "max_us": self.max_ns / 1000,
+        }
+
+
+class Gauge:
+    def __init__(self):
+        self.last = 0
+        self.max = 0
+        self.total = 0
+        self.count = 0
+
+    def record(self, value):
+        self.last = value
+        self.max = max(self.max, value)
+        self.total += value
+        self.count += 1
+
+    def summary(self):
+        return {"last": self.last, "max": self.max, "mean": self.total / self.count if self.count else 0}
+
+
+class Instrumentation:
+    # Methods timed on the TransactionManager and on every DataManager
+    MANAGER_METHODS = ("start_transaction", "read_intention", "write_intention", "commit", "update_site_status",
+                       "find_cycle", "has_cycle", "collect_garbage", "querystate", "run_anti_entropy")
+    SITE_METHODS = ("read_version", "write", "fail", "recover")
+
+    def __init__(self, sample_limit=10000, seed=0):
+        self.sample_limit = sample_limit    # Maximum samples kept per timer for percentiles
+        self.rng = random.Random(seed)
+        self.timers = {}                    # "Class.method" -> Timer
+        self.gauges = {}                    # Gauge name -> Gauge
+        self.patched = []                   # (object, attribute) pairs to restore on detach
+        self.transaction_manager = None
+
+    def attach(self, transaction_manager):
+        """
+        Start instrumenting a TransactionManager and its sites.
+        """
+        self.transaction_manager = transaction_manager
+        for name in self.MANAGER_METHODS:
+            self.wrap(transaction_manager, name, f"TransactionManager.{name}")
+        for site in transaction_manager.sites.values():
+            for name in self.SITE_METHODS:
+                self.wrap(site, name, f"DataManager.{name}")
+
+        # Sample sizes after every commit
+        commit = transaction_manager.commit
+
+        def commit_and_sample(*args, **kwargs):
+            try:
+                return commit(*args, **kwargs)
+            finally:
+                self.sample(transaction_manager)
+
+        transaction_manager.commit = commit_and_sample
+        return self
+
+    def detach(self):
+        """
+        Stop instrumenting: the original methods are used again.
+        """
+        for owner, name in reversed(self.patched):
+            owner.__dict__.pop(name, None)
+        self.patched.clear()
+
+    def wrap(self, owner, name, label):
+        """
+        Replace owner.name with a timed version that records into the timer called label.
+        """
+        original = getattr(owner, name)
+        timer = self.timers.get(label)
+        if timer is None:
+            timer = self.timers[label] = Timer(self.sample_limit, self.rng)
+        clock = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                timer.record(clock() - start)
+
+        setattr(owner, name, timed)
+        self.patched.append((owner, name))
+
+    def gauge(self, name, value):
+        gauge = self.gauges.get(name)
+        if gauge is None:
+            gauge = self.gauges[name] = Gauge()
+        gauge.record(value)
+
+    def sample(self, transaction_manager):
+        """
+        Record the size of the structures that commit cost depends on.
+        """
+        self.gauge("graph_nodes", len(transaction_manager.serialization_graph))
+        self.gauge("transactions", len(transaction_manager.transactions))
+        self.gauge("wait_queue_depth", len(transaction_manager.waiting_read_queue))
+
+    def version_chain_lengths(self):
+        """
+        Return the longest and mean version chain length across all sites.
+        """
+        lengths = [
+            len(history)
+            for site in self.transaction_manager.sites.values()
+            for history in site.version_history.values()
+        ]
+        return {"max": max(lengths, default = 0), "mean": sum(lengths) / len(lengths) if lengths else 0}
+
+    def snapshot(self):
+        """
+        Return all measurements collected so far.
+        """
+        transaction_manager = self.transaction_manager
+        return {
+            "timers": {label: timer.summary() for label, timer in self.timers.items() if timer.count},
+            "gauges": {name: gauge.summary() for name, gauge in self.gauges.items()},
+            "version_chains": self.version_chain_lengths() if transaction_manager else {},
+            "wait_queue": transaction_manager.waiting_read_queue.stats() if transaction_manager else {},
+            "abort_reasons": dict(transaction_manager.abort_reasons) if transaction_manager else {},
+            "reads_per_site": dict(transaction_manager.replica_selector.load) if transaction_manager else {},
+            "anti_entropy": dict(transaction_manager.anti_entropy_stats) if transaction_manager else {},
+            "read_cache": dict(transaction_manager.read_cache_stats) if transaction_manager else {},
+        }
+
+    def report(self):
+        """
+        Return the snapshot formatted as text.
+        """
+        snapshot = self.snapshot()
+        lines = ["--- Instrumentation ---"]
+        lines.append(f"{'method':<36}  {'calls':>8}  {'total ms':>10}  {'mean us':>9}  {'p50 us':>9}  "
+                     f"{'p99 us':>9}  {'max us':>9}")
+        for label, stats in sorted(snapshot["timers"].items(), key = lambda item: -item[1]["total_ms"]):
+            lines.append(f"{label:<36}  {stats['count']:>8}  {stats['total_ms']:>10.3f}  {stats['mean_us']:>9.1f}  "
+                         f"{stats['p50_us']:>9.1f}  {stats['p99_us']:>9.1f}  {stats['max_us']:>9.1f}")
+        for name, stats in snapshot["gauges"].items():
+            lines.append(f"{name}: last {stats['last']}, max {stats['max']}, mean {stats['mean']:.1f}")
+        chains = snapshot["version_chains"]
+        if chains:
+            lines.append(f"version chain length: max {chains['max']}, mean {chains['mean']:.2f}")
+        queue = snapshot["wait_queue"]
+        if queue:
+            lines.append(f"wait queue: depth {queue['depth']}, peak {queue['peak_depth']}, "
+                         f"mean wait {queue['mean_wait_time']:.1f}")
+        if snapshot["reads_per_site"]:
+            lines.append("reads per site: " + ", ".join(
+                f"{site_id}: {count}" for site_id, count in snapshot["reads_per_site"].items()))
+        anti_entropy = snapshot["anti_entropy"]
+        if anti_entropy.get("batches"):
+            lines.append(f"anti-entropy: {anti_entropy['batches']} batches, {anti_entropy['variables']} variables, "
+                         f"{anti_entropy['versions_copied']} versions copied")
+        read_cache = snapshot["read_cache"]
+        if read_cache.get("hits") or read_cache.get("misses"):
+            lookups = read_cache["hits"] + read_cache["misses"]
+            lines.append(f"read cache: {read_cache['hits']} hits of {lookups} lookups "
+                         f"({100 * read_cache['hits'] / lookups:.1f}%)")
+        for reason, count in sorted(snapshot["abort_reasons"].items()):
+            lines.append(f"aborts ({reason}): {count}")
+        lines.append("-----------------------")
+        return "\n".join(lines)
@@ -0,0 +1,114 @@
+"""
+-------------------------------------------------------------------------------
+Author(s): Rahi Krishna (rk4748), Tanmay G. Dadhania (tgd8275)
+Date: October 16, 2026
+
+Description:
+This file is a load-generating client for Server.py.
+It opens several concurrent connections; each one replays its own synthetic workload (from WorkloadGenerator, with
+transaction ids offset so connections never collide), keeping up to --pipeline commands in flight.
+It reports overall throughput, command latency percentiles, and the number of error replies.
+-------------------------------------------------------------------------------
+"""
+
+import re
+import time
+import asyncio
+import argparse
+
+from WorkloadGenerator import WorkloadGenerator
+
+TRANSACTION_PATTERN = re.compile(r"T(\d+)")
+
+
+class LoadClient:
+    def __init__(self, connections=8, pipeline=16, host="127.0.0.1", port=8765, unix_socket=None, **workload):
+        self.connections = connections      # Number of concurrent client connections
+        self.pipeline = pipeline            # Maximum commands in flight per connection
+        self.host = host
+        self.port = port
+        self.unix_socket = unix_socket
+        self.workload = workload            # Keyword arguments for WorkloadGenerator
+        self.latencies = []                 # Seconds from sending a command to receiving its status line
+        self.errors = 0
+
+    def commands_for(self, connection_id):
+        """
+        Return the workload of one connection, with transaction ids moved into a range of their own.
+        """
+        generator = WorkloadGenerator(seed = connection_id, dump = False, **self.workload)
+        offset = (connection_id + 1) * 10 ** 7
+        return [TRANSACTION_PATTERN.sub(lambda match: f"T{int(match.group(1)) + offset}", line)
+                for line in generator.generate()]
+
+    async def run_connection(self, connection_id):
+        if self.unix_socket:
+            reader, writer = await asyncio.open_unix_connection(self.unix_socket)
+        else:
+            reader, writer = await asyncio.open_connection(self.host, self.port)
+
+        commands = self.commands_for(connection_id)
+        sent_at = []            # Send times of the commands still waiting for a status line
+        in_flight = asyncio.Semaphore(self.pipeline)
+
+        async def send_all():
+            for command in commands:
+                await in_flight.acquire()
+                sent_at.append(time.perf_counter())
+                writer.write(f"{command}\n".encode())
+                await writer.drain()
+
+        sender = asyncio.create_task(send_all())
+        received = 0
+        while received < len(commands):
+            line = (await reader.readline()).decode()
+            if not line:
+                break
+            if line.startswith(". "):  # Status line: the oldest in-flight command finished
+                self.latencies.append(time.perf_counter() - sent_at[received])
+                if line.startswith(". error"):
+                    self.errors += 1
+                received += 1
+                in_flight.release()
+
+        await sender
+        writer.close()
+        await writer.wait_closed()
+
+    async def run(self):
+        start = time.perf_counter()
+        await asyncio.gather(*(self.run_connection(connection_id) for connection_id in range(self.connections)))
+        return time.perf_counter() - start
+
+    def report(self, wall_time):
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction):
+            if not latencies:
+                return 0
+            return latencies[max(0, min(len(latencies) - 1, round(fraction * len(latencies)) - 1))] * 1e6
+
+        print(f"connections: {self.connections} (pipeline {self.pipeline})")
+        print(f"commands:    {len(latencies)} in {wall_time:.3f}s = {len(latencies) / wall_time:.0f} commands/sec")
+        print(f"latency:     p50 {percentile(0.5):.0f} us, p90 {percentile(0.9):.0f} us, "
+              f"p99 {percentile(0.99):.0f} us, max {percentile(1.0):.0f} us")
+        print(f"errors:      {self.errors}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Generate load against Server.py")
+    parser.add_argument("--host", default = "127.0.0.1", help = "Server host (default: 127.0.0.1)")
+    parser.add_argument("--port", type = int, default = 8765, help = "Server TCP port (default: 8765)")
+    parser.add_argument("--unix-socket", help = "Connect to this Unix socket instead of TCP")
+    parser.add_argument("--connections", type = int, default = 8, help = "Concurrent connections (default: 8)")
+    parser.add_argument("--pipeline", type = int, default = 16, help = "Commands in flight per connection")
+    parser.add_argument("--transactions", type = int, default = 1000, help = "Transactions per connection")
+    parser.add_argument("--read-ratio", type = float, default = 0.7, help = "Fraction of operations that are reads")
+    parser.add_argument("--zipf", type = float, default = 0.0, help = "Zipf skew of variable accesses")
+    args = parser.parse_args()
+
+    client = LoadClient(
+        args.connections, args.pipeline, args.host, args.port, args.unix_socket,
+        transactions = args.transactions, read_ratio = args.read_ratio, zipf_skew = args.zipf
+    )
+    client.report(asyncio.run(client.run()))
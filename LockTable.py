@@ -0,0 +1,95 @@
+"""
+-------------------------------------------------------------------------------
+Author(s): Rahi Krishna (rk4748), Tanmay G. Dadhania (tgd8275)
+Date: October 16, 2026
+
+Description:
+This file defines the LockTable class, which holds the shared ("S") and exclusive ("X") locks of the variables of
+one site for the two-phase locking engine. A request that cannot be granted joins the variable's queue, and the
+table reports which transactions it waits for: the holders of conflicting locks and the transactions queued ahead
+of it for conflicting locks, so waiters are served in arrival order. Those answers are the edges of the engine's
+wait-for graph. A lock upgrade (S to X) by a holder only waits for the other holders.
+-------------------------------------------------------------------------------
+"""
+
+
+class LockTable:
+    def __init__(self):
+        self.holders = {}   # variable -> {transaction_id: "S"/"X"}
+        self.queues = {}    # variable -> {transaction_id: mode} of waiting requests, in arrival order
+        self.held = {}      # transaction_id -> variables it holds locks on
+        self.queued = {}    # transaction_id -> variables it is queued for
+
+    def blockers(self, transaction_id, variable, mode):
+        """
+        Return the transactions a lock request has to wait for; an empty set means it can be granted.
+        """
+        holders = self.holders.get(variable, {})
+        blocking = {holder for holder, held_mode in holders.items()
+                    if holder != transaction_id and (mode == "X" or held_mode == "X")}
+        if transaction_id in holders:
+            return blocking  # An upgrade does not queue behind waiters, which would wait for it anyway
+
+        for waiter, waiting_mode in self.queues.get(variable, {}).items():
+            if waiter == transaction_id:
+                break
+            if mode == "X" or waiting_mode == "X":
+                blocking.add(waiter)
+        return blocking
+
+    def holds(self, transaction_id, variable, mode="S"):
+        """
+        Return True if the transaction holds a lock on the variable at least as strong as mode.
+        """
+        held_mode = self.holders.get(variable, {}).get(transaction_id)
+        return held_mode is not None and (mode == "S" or held_mode == "X")
+
+    def grant(self, transaction_id, variable, mode):
+        """
+        Give the transaction the lock (callers check blockers() first), leaving the queue if it was waiting.
+        """
+        holders = self.holders.setdefault(variable, {})
+        if holders.get(transaction_id) != "X":
+            holders[transaction_id] = mode
+        self.held.setdefault(transaction_id, set()).add(variable)
+        self.dequeue(transaction_id, variable)
+
+    def enqueue(self, transaction_id, variable, mode):
+        """
+        Queue a request that has to wait, keeping its place if it is already queued.
+        """
+        queue = self.queues.setdefault(variable, {})
+        if queue.get(transaction_id) != "X":
+            queue[transaction_id] = mode
+        self.queued.setdefault(transaction_id, set()).add(variable)
+
+    def dequeue(self, transaction_id, variable):
+        queue = self.queues.get(variable)
+        if queue is not None and queue.pop(transaction_id, None) is not None:
+            if not queue:
+                del self.queues[variable]
+            variables = self.queued[transaction_id]
+            variables.discard(variable)
+            if not variables:
+                del self.queued[transaction_id]
+
+    def release(self, transaction_id):
+        """
+        Release every lock of a transaction and withdraw its queued requests.
+        """
+        for variable in self.held.pop(transaction_id, ()):
+            holders = self.holders[variable]
+            del holders[transaction_id]
+            if not holders:
+                del self.holders[variable]
+        for variable in list(self.queued.get(transaction_id, ())):
+            self.dequeue(transaction_id, variable)
+
+    def clear(self):
+        """
+        Drop every lock and queued request, as a site failure loses its lock table.
+        """
+        self.holders.clear()
+        self.queues.clear()
+        self.held.clear()
+        self.queued.clear()
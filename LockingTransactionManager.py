@@ -0,0 +1,362 @@
+"""
+-------------------------------------------------------------------------------
+Author(s): Rahi Krishna (rk4748), Tanmay G. Dadhania (tgd8275)
+Date: October 16, 2026
+
+Description:
+This file defines the LockingTransactionManager, the "2pl" engine: strict two-phase locking with available copies,
+behind the same interface as the TransactionManager ("ssi") it extends (start_transaction, read_intention,
+write_intention, commit, update_site_status, querystate). Main.ENGINES maps engine names to both classes.
+Under strict 2PL a read takes a shared lock on the replica it reads, and a write takes exclusive locks on every
+replica that is up; all locks are held until the transaction ends, and the writes are applied at commit.
+Each site has a LockTable, lost when the site fails; a transaction that accessed a site that failed before its end
+aborts at commit. A replicated variable on a recovered site is readable again once a write has committed to it
+there (or anti-entropy caught it up). An operation that cannot get its locks blocks its transaction: the operation
+and the transaction's later commands wait and are retried whenever locks are released or a site changes state.
+Deadlocks are found in the wait-for graph and broken by aborting the youngest transaction of the cycle.
+Read-only transactions do not lock; they read their snapshot exactly as under SSI.
+-------------------------------------------------------------------------------
+"""
+
+from collections import deque
+
+from LockTable import LockTable
+from TransactionManager import TransactionManager
+
+
+class LockingTransactionManager(TransactionManager):
+    EAGER_VALIDATION_MODES = ("flag", "abort")  # A failed access is final, so the commit's decision is known early
+
+    def __init__(self, *args, **kwargs):
+        self.lock_tables = {}                   # site_id -> LockTable
+        self.blocked_operations = {}            # transaction_id -> deque of waiting operations, in blocking order
+        self.waits_for = {}                     # Wait-for graph: blocked transaction_id -> transaction_ids it waits for
+        self.site_accesses = {}                 # transaction_id -> {site_id: time the transaction first locked it}
+        self.reported_waits = {}                # transaction_id -> waiting operation whose wait was reported
+        super().__init__(*args, **kwargs)
+        self.lock_tables = {site_id: LockTable() for site_id in self.sites}
+
+    def start_transaction(self, transaction_id, timestamp, is_read_only=False):
+        # A restarted transaction gives up whatever the old one held
+        if transaction_id in self.transactions:
+            self.release(transaction_id)
+        super().start_transaction(transaction_id, timestamp, is_read_only)
+        self.site_accesses[transaction_id] = {}
+
+    def read_intention(self, transaction_id, variable, timestamp=None):
+        """
+        Read a variable under a shared lock, or queue the read if the transaction is blocked.
+        """
+        if transaction_id not in self.transactions:
+            raise Exception(f"Transaction T{transaction_id} does not exist.")
+
+        transaction = self.transactions[transaction_id]
+        if transaction.is_read_only:
+            return super().read_intention(transaction_id, variable, timestamp)
+        self.submit(transaction, ("read", variable), timestamp)
+
+    def write_intention(self, transaction_id, variable, value, timestamp):
+        """
+        Lock every available replica of a variable and buffer the write, or queue it if the transaction is blocked.
+        """
+        if transaction_id not in self.transactions:
+            raise Exception(f"Transaction T{transaction_id} does not exist.")
+
+        transaction = self.transactions[transaction_id]
+        if transaction.is_read_only:
+            raise Exception(f"Transaction T{transaction_id} is read-only and cannot write {variable}.")
+        self.submit(transaction, ("write", variable, value), timestamp)
+
+    def commit(self, transaction_id, time):
+        """
+        Commit a transaction once its earlier operations have run, applying its writes and releasing its locks.
+        """
+        if transaction_id not in self.transactions:
+            raise Exception(f"Transaction T{transaction_id} does not exist.")
+
+        transaction = self.transactions[transaction_id]
+        if transaction.is_read_only:
+            return super().commit(transaction_id, time)
+        self.submit(transaction, ("commit",), time)
+
+    def update_site_status(self, site_id, status, timestamp):
+        was_up = self.site_status.get(site_id) == "up"
+        super().update_site_status(site_id, status, timestamp)
+        if status == "down" and was_up:
+            self.lock_tables[site_id].clear()
+        self.settle(timestamp)
+
+    def validate_after_failure(self, site_id, timestamp):
+        """
+        Eager validation: an active transaction that locked something on the failed site can no longer commit, and
+        in "abort" mode it is aborted now so its locks stop holding up waiters.
+        """
+        for transaction_id, accesses in list(self.site_accesses.items()):
+            transaction = self.transactions.get(transaction_id)
+            if transaction is None or transaction.status != "active":
+                continue  # Already ended, or retired by garbage collection
+            if site_id not in accesses or transaction_id in self.doomed:
+                continue
+            self.doomed[transaction_id] = "site_failure"
+            if self.eager_validation == "abort":
+                self.sink.emit("abort_site_failure", transaction_id = transaction_id, site_id = site_id,
+                               access_time = accesses[site_id], failure_timestamp = timestamp)
+                self.abort(transaction, "site_failure", timestamp)
+            else:
+                self.sink.emit("doomed", transaction_id = transaction_id, reason = "site_failure")
+
+    def begin_commit_group(self):
+        """
+        Commits are not grouped: the locks a commit releases let waiting operations run at once, and those must
+        see the committed writes.
+        """
+
+    def end_transaction(self, transaction, time):
+        super().end_transaction(transaction, time)
+        self.site_accesses.pop(transaction.transaction_id, None)
+
+    def abort(self, transaction, reason, time):
+        """
+        Abort a transaction and release its locks. If its end command is among its waiting operations, the
+        transaction ends now.
+        """
+        operations = self.blocked_operations.get(transaction.transaction_id, ())
+        self.site_accesses.pop(transaction.transaction_id, None)
+        self.abort_transaction(transaction, reason)
+        if any(operation[0] == "commit" for operation in operations):
+            self.end_transaction(transaction, time)
+        self.release(transaction.transaction_id)
+
+    def release(self, transaction_id):
+        """
+        Release the locks of a transaction and drop the operations it has waiting.
+        """
+        for lock_table in self.lock_tables.values():
+            lock_table.release(transaction_id)
+        self.blocked_operations.pop(transaction_id, None)
+        self.waits_for.pop(transaction_id, None)
+        self.reported_waits.pop(transaction_id, None)
+
+    def submit(self, transaction, operation, timestamp):
+        """
+        Run an operation, or queue it behind the operations its transaction already has waiting.
+        """
+        if transaction.status != "active":
+            if transaction.status == "aborted" and operation[0] == "commit":
+                self.end_transaction(transaction, timestamp)
+            return
+
+        transaction_id = transaction.transaction_id
+        if transaction_id in self.blocked_operations:
+            self.blocked_operations[transaction_id].append(operation)
+            return
+
+        if not self.execute(transaction, operation, timestamp):
+            self.blocked_operations[transaction_id] = deque([operation])
+            self.report_wait(transaction_id, operation)
+        self.settle(timestamp)
+
+    def report_wait(self, transaction_id, operation):
+        """
+        Report the first time an operation has to wait.
+        """
+        if self.reported_waits.get(transaction_id) is operation:
+            return
+        self.reported_waits[transaction_id] = operation
+        blockers = self.waits_for.get(transaction_id)
+        if blockers:
+            self.sink.emit("wait_lock", transaction_id = transaction_id, variable = operation[1],
+                           blockers = sorted(blockers))
+        else:
+            self.sink.emit("wait_site", transaction_id = transaction_id, variable = operation[1])
+
+    def execute(self, transaction, operation, timestamp):
+        """
+        Try to run an operation. Returns False if it has to wait, with its wait-for edges recorded.
+        """
+        kind = operation[0]
+        if kind == "read":
+            return self.execute_read(transaction, operation[1], timestamp)
+        if kind == "write":
+            return self.execute_write(transaction, operation[1], operation[2], timestamp)
+        self.execute_commit(transaction, timestamp)
+        return True
+
+    def is_readable(self, site_id, variable):
+        """
+        Return True if a site that is up holds a current copy of a variable: it is not replicated, the site never
+        recovered, or a write (or an anti-entropy copy) reached the site after its last recovery.
+        """
+        last_recovery_time = self.site_timelines[site_id].last_recovery_time
+        if last_recovery_time is None or not self.catalog.is_replicated(variable):
+            return True
+        if variable in self.sync_times[site_id]:
+            return True
+        commit_time = self.sites[site_id].latest_commit_time(variable)
+        return commit_time is not None and commit_time > last_recovery_time
+
+    def execute_read(self, transaction, variable, timestamp):
+        transaction_id = transaction.transaction_id
+        if variable in transaction.write_set:
+            value = transaction.write_set[variable][0]
+            self.sink.emit("read_own_write", transaction_id = transaction_id, variable = variable, value = value)
+            return True
+
+        readable_sites = []
+        replica_down = False
+        for site_id in self.replica_selector.order(variable, self.catalog.sites_for(variable)):
+            if self.site_status[site_id] != "up":
+                replica_down = True
+            elif self.is_readable(site_id, variable):
+                readable_sites.append(site_id)
+
+        if not readable_sites:
+            if replica_down:
+                self.waits_for[transaction_id] = set()  # Waits for a recovery, not for a transaction
+                return False
+            self.sink.emit("abort_no_valid_site", transaction_id = transaction_id, variable = variable)
+            self.abort(transaction, "no_valid_site", timestamp)
+            return True
+
+        site_id = readable_sites[0]
+        lock_table = self.lock_tables[site_id]
+        blockers = lock_table.blockers(transaction_id, variable, "S")
+        if blockers:
+            lock_table.enqueue(transaction_id, variable, "S")
+            self.waits_for[transaction_id] = blockers
+            return False
+
+        lock_table.grant(transaction_id, variable, "S")
+        self.site_accesses[transaction_id].setdefault(site_id, timestamp)
+        self.waits_for.pop(transaction_id, None)
+        value = self.sites[site_id].variables[variable]
+        transaction.add_read(variable)
+        self.replica_selector.record_read(variable, site_id)
+        self.sink.emit("read", transaction_id = transaction_id, variable = variable, value = value, site_id = site_id)
+        return True
+
+    def execute_write(self, transaction, variable, value, timestamp):
+        transaction_id = transaction.transaction_id
+        up_sites = [site_id for site_id in self.catalog.sites_for(variable) if self.site_status[site_id] == "up"]
+        if not up_sites:
+            self.waits_for[transaction_id] = set()  # Waits for a recovery, not for a transaction
+            return False
+
+        blockers = set()
+        for site_id in up_sites:
+            blockers |= self.lock_tables[site_id].blockers(transaction_id, variable, "X")
+        if blockers:
+            for site_id in up_sites:
+                self.lock_tables[site_id].enqueue(transaction_id, variable, "X")
+            self.waits_for[transaction_id] = blockers
+            return False
+
+        accesses = self.site_accesses[transaction_id]
+        for site_id in up_sites:
+            self.lock_tables[site_id].grant(transaction_id, variable, "X")
+            accesses.setdefault(site_id, timestamp)
+        self.waits_for.pop(transaction_id, None)
+        transaction.add_write(variable, value, timestamp)
+        return True
+
+    def execute_commit(self, transaction, time):
+        transaction_id = transaction.transaction_id
+        accesses = self.site_accesses[transaction_id]
+        self.collect_garbage(time)
+        self.end_transaction(transaction, time)
+        self.doomed.pop(transaction_id, None)
+
+        # Available copies: a failed site lost the transaction's locks and maybe its writes
+        for site_id, access_time in sorted(accesses.items()):
+            failure_timestamp = self.site_timelines[site_id].first_failure_after(access_time)
+            if failure_timestamp is not None:
+                self.sink.emit("abort_site_failure", transaction_id = transaction_id, site_id = site_id,
+                               access_time = access_time, failure_timestamp = failure_timestamp)
+                self.abort(transaction, "site_failure", time)
+                return
+
+        # Write every replica the transaction locked; the versions take the commit time
+        site_batches = {}
+        for variable, (value, _) in transaction.write_set.items():
+            written_sites = [site_id for site_id in self.catalog.sites_for(variable)
+                             if self.site_status[site_id] == "up"
+                             and self.lock_tables[site_id].holds(transaction_id, variable, "X")]
+            for site_id in written_sites:
+                site_batches.setdefault(site_id, []).append((variable, value, time))
+            for site_id in self.catalog.sites_for(variable):
+                # A site that recovered after the locks were taken misses the write; its caught-up copy is stale
+                if site_id not in written_sites and self.sync_times[site_id].pop(variable, None) is not None:
+                    self.catch_up_queues.setdefault(site_id, deque()).append(variable)
+                    self.replica_epoch += 1
+            if written_sites:
+                self.sink.emit("write", transaction_id = transaction_id, variable = variable, sites = written_sites)
+        self.apply_site_writes(site_batches, self.version_watermark(time))
+
+        transaction.commit_time = time
+        self.record_commit(transaction)
+        self.release(transaction_id)
+        self.sink.emit("commit", transaction_id = transaction_id)
+
+    def settle(self, timestamp):
+        """
+        Retry the waiting operations until none can make progress, then break a deadlock if there is one and start
+        over, until every waiting transaction waits for a live one (or for a recovery).
+        """
+        while True:
+            progress = True
+            while progress:
+                progress = False
+                for transaction_id in list(self.blocked_operations):
+                    operations = self.blocked_operations.get(transaction_id)
+                    if operations is None:
+                        continue  # Aborted by an operation retried before it
+                    transaction = self.transactions[transaction_id]
+                    while self.execute(transaction, operations[0], timestamp):
+                        progress = True
+                        operations.popleft()
+                        if transaction.status != "active" or not operations:
+                            break
+                    else:
+                        self.report_wait(transaction_id, operations[0])
+                        continue
+                    self.blocked_operations.pop(transaction_id, None)
+                    self.reported_waits.pop(transaction_id, None)
+
+            cycle = self.find_deadlock()
+            if cycle is None:
+                return
+            victim = max(cycle, key = lambda tid: (self.transactions[tid].start_time, tid))
+            self.sink.emit("abort_deadlock", transaction_id = victim, cycle = cycle)
+            self.abort(self.transactions[victim], "deadlock", timestamp)
+
+    def find_deadlock(self):
+        """
+        Return the transactions of a cycle in the wait-for graph, in wait order, or None if there is none.
+        """
+        visited = set()
+        for start in sorted(self.blocked_operations):
+            if start in visited:
+                continue
+            path = []
+            on_path = {}
+            stack = [(start, iter(sorted(self.waits_for.get(start, ()))))]
+            path.append(start)
+            on_path[start] = 0
+            visited.add(start)
+            while stack:
+                transaction_id, successors = stack[-1]
+                for successor in successors:
+                    if successor not in self.blocked_operations:
+                        continue  # A running transaction will release its locks
+                    if successor in on_path:
+                        return path[on_path[successor]:]
+                    if successor not in visited:
+                        visited.add(successor)
+                        on_path[successor] = len(path)
+                        path.append(successor)
+                        stack.append((successor, iter(sorted(self.waits_for.get(successor, ())))))
+                        break
+                else:
+                    stack.pop()
+                    del on_path[path.pop()]
+        return None
@@ -13,74 +13,320 @@ It acts as a bridge between user input and the core functionality provided by th
 
 import re
 import sys
+import shlex
 import argparse
 from TransactionManager import TransactionManager
+from LockingTransactionManager import LockingTransactionManager
+from PlacementCatalog import PlacementCatalog
+from ReplicaSelector import ReplicaSelector
+from EventSink import SINKS
+from Instrumentation import Instrumentation
+
+
+# Precompiled tokenizer for commands of the form `command(arg1, arg2, ...)`
+COMMAND_PATTERN = re.compile(r"(\w+)\s*\(\s*([^)]*)\s*\)")
+
+# Options comment of a trace: `// options: <flags>` or `# options: <flags>`
+OPTIONS_PATTERN = re.compile(r"(?://|#)\s*options:\s*(.*)")
+
+# Number of characters read from the input per chunk
+READ_CHUNK_SIZE = 1 << 20
 
 
 class Main:
     @staticmethod
-    def main(input_file: str) -> None:
-        transaction_manager = TransactionManager()
+    def main(input_file: str, transaction_manager: TransactionManager = None) -> TransactionManager:
+        if transaction_manager is None:
+            transaction_manager = TransactionManager()
 
         try:
-            with open(input_file, "r") as file:
-                timestamp = 1  # Logical timestamp to simulate the order of operations
+            if input_file == "-":
+                Main.execute(Main.parse(Main.read_lines(sys.stdin)), transaction_manager)
+            else:
+                with open(input_file, "r", buffering = READ_CHUNK_SIZE) as file:
+                    Main.execute(Main.parse(Main.read_lines(file)), transaction_manager)
+        except OSError as e:
+            print(f"Error: {e}", file = sys.stderr)
+        finally:
+            transaction_manager.sink.close()  # Write out the buffered output
 
-                for line in file:
-                    line = line.strip()
+        return transaction_manager
+
+    @staticmethod
+    def read_lines(stream):
+        """
+        Yield the lines of a stream, reading it in large chunks.
+        """
+        while True:
+            lines = stream.readlines(READ_CHUNK_SIZE)
+            if not lines:
+                return
+            yield from lines
 
-                    # Ignore empty lines and lines starting with comments ('//' or '#')
-                    if not line or line.startswith("//") or line.startswith("#"):
-                        continue
+    @staticmethod
+    def parse(lines):
+        """
+        Tokenize lines into (line_number, command, args) tuples.
+        Empty lines and comments (starting with '//' or '#') are skipped; malformed lines are reported and skipped.
+        """
+        match_command = COMMAND_PATTERN.match
+        for line_number, line in enumerate(lines, start = 1):
+            line = line.strip()
 
-                    # Parse command using regex to handle formats like `command(arg1, arg2, ...)`
-                    match = re.match(r"(\w+)\s*\(\s*([^)]*)\s*\)", line)
-                    if not match:
-                        print(f"Invalid command format: {line}", file=sys.stderr)
-                        continue
+            # Ignore empty lines and lines starting with comments ('//' or '#')
+            if not line or line.startswith("//") or line.startswith("#"):
+                continue
 
-                    command, args = match.groups()
-                    args = [arg.strip() for arg in args.split(",")] if args else []
+            match = match_command(line)
+            if not match:
+                print(f"Line {line_number}: Invalid command format: {line}", file = sys.stderr)
+                continue
 
-                    # Handle commands
-                    if command == "begin":
-                        transaction_id = int(args[0][1:])  # Strip 'T' and convert to int
-                        transaction_manager.start_transaction(transaction_id, timestamp)
+            command, args = match.groups()
+            yield line_number, command, [arg.strip() for arg in args.split(",")] if args else []
 
-                    elif command == "R":
-                        transaction_id = int(args[0][1:])  # Strip 'T' and convert to int
-                        variable_id = int(args[1][1:])  # Strip 'x' and convert to int
-                        transaction_manager.read_intention(transaction_id, f"x{variable_id}")
+    @staticmethod
+    def execute(commands, transaction_manager: TransactionManager) -> None:
+        """
+        Run parsed commands against the transaction manager through the dispatch table.
+        An error on one line is reported and does not stop the run.
+        """
+        timestamp = transaction_manager.restored_time + 1  # Logical timestamp to simulate the order of operations
+        in_commit_group = False
 
-                    elif command == "W":
-                        transaction_id = int(args[0][1:])  # Strip 'T' and convert to int
-                        variable_id = int(args[1][1:])  # Strip 'x' and convert to int
-                        value = int(args[2])  # Convert value to int
-                        transaction_manager.write_intention(transaction_id, f"x{variable_id}", value, timestamp)
+        try:
+            for line_number, command, args in commands:
+                # Consecutive end commands form a commit group whose site writes are applied together
+                if command == "end" and not in_commit_group:
+                    transaction_manager.begin_commit_group()
+                    in_commit_group = True
+                elif command != "end" and in_commit_group:
+                    transaction_manager.end_commit_group(timestamp - 1)
+                    in_commit_group = False
+                transaction_manager.tick(timestamp)
 
-                    elif command == "fail":
-                        site_id = int(args[0])  # Convert to int
-                        transaction_manager.update_site_status(site_id, "down", timestamp)
+                handler = COMMAND_HANDLERS.get(command)
+                if handler is None:
+                    print(f"Line {line_number}: Unknown command: {command}", file = sys.stderr)
+                else:
+                    try:
+                        handler(transaction_manager, args, timestamp)
+                    except Exception as e:
+                        print(f"Line {line_number}: Error: {e}", file = sys.stderr)
 
-                    elif command == "recover":
-                        site_id = int(args[0])  # Convert to int
-                        transaction_manager.update_site_status(site_id, "up", timestamp)
+                # Increment the logical timestamp after processing each line
+                timestamp += 1
+        finally:
+            if in_commit_group:
+                transaction_manager.end_commit_group(timestamp - 1)
 
-                    elif command == "end":
-                        transaction_id = int(args[0][1:])  # Strip 'T' and convert to int
-                        transaction_manager.commit(transaction_id, timestamp)
+    @staticmethod
+    def begin(transaction_manager, args, timestamp):
+        transaction_manager.start_transaction(int(args[0][1:]), timestamp)  # Strip 'T' and convert to int
 
-                    elif command == "dump":
-                        transaction_manager.querystate()
+    @staticmethod
+    def begin_read_only(transaction_manager, args, timestamp):
+        transaction_manager.start_transaction(int(args[0][1:]), timestamp, is_read_only = True)
 
-                    else:
-                        print(f"Unknown command: {command}", file = sys.stderr)
+    @staticmethod
+    def read(transaction_manager, args, timestamp):
+        variable = transaction_manager.catalog.variable_name(int(args[1][1:]))  # Strip 'x' and normalize the name
+        transaction_manager.read_intention(int(args[0][1:]), variable, timestamp)
 
-                    # Increment the logical timestamp after processing each line
-                    timestamp += 1
+    @staticmethod
+    def write(transaction_manager, args, timestamp):
+        variable = transaction_manager.catalog.variable_name(int(args[1][1:]))  # Strip 'x' and normalize the name
+        transaction_manager.write_intention(int(args[0][1:]), variable, int(args[2]), timestamp)
 
-        except Exception as e:
-            print(f"Error: {e}", file = sys.stderr)
+    @staticmethod
+    def fail(transaction_manager, args, timestamp):
+        transaction_manager.update_site_status(int(args[0]), "down", timestamp)
+
+    @staticmethod
+    def recover(transaction_manager, args, timestamp):
+        transaction_manager.update_site_status(int(args[0]), "up", timestamp)
+
+    @staticmethod
+    def end(transaction_manager, args, timestamp):
+        transaction_manager.commit(int(args[0][1:]), timestamp)  # Strip 'T' and convert to int
+
+    @staticmethod
+    def dump(transaction_manager, args, timestamp):
+        # Optional arguments: site ids, variables, @<timestamp> for past values, delta for changes only
+        site_ids, variables, as_of, delta = [], [], None, False
+        for arg in args:
+            if arg == "delta":
+                delta = True
+            elif arg.startswith("@"):
+                as_of = int(arg[1:])
+            elif arg.startswith("x"):
+                variables.append(transaction_manager.catalog.variable_name(int(arg[1:])))
+            else:
+                site_ids.append(int(arg))
+        transaction_manager.querystate(site_ids or None, variables or None, as_of, delta)
+
+    @staticmethod
+    def argument_parser():
+        """
+        Build the command-line parser shared by Main and BatchRunner.
+        """
+        parser = argparse.ArgumentParser(description = "Replicated Concurrency Control and Recovery")
+        parser.add_argument(
+            "input_file",
+            type = str,
+            help = "Path to the input file containing transaction commands, or - to read from stdin"
+        )
+        parser.add_argument(
+            "--engine",
+            choices = sorted(ENGINES),
+            default = "ssi",
+            help = "Concurrency control engine: ssi (serializable snapshot isolation, default) or 2pl (strict 2PL)"
+        )
+        parser.add_argument(
+            "--gc",
+            action = "store_true",
+            help = "Retire finished transactions once no active transaction can conflict with them"
+        )
+        parser.add_argument("--sites", type = int, default = 10, help = "Number of sites (default: 10)")
+        parser.add_argument("--variables", type = int, default = 20, help = "Number of variables (default: 20)")
+        parser.add_argument(
+            "--replication-factor",
+            type = int,
+            default = None,
+            help = "Number of copies of each replicated variable (default: every site)"
+        )
+        parser.add_argument(
+            "--placement",
+            choices = PlacementCatalog.POLICIES,
+            default = "modulo",
+            help = "Replica placement policy (default: modulo)"
+        )
+        parser.add_argument(
+            "--history",
+            type = int,
+            default = 0,
+            help = "Keep versions written in the last N timestamps for dump(@N) queries (default: 0)"
+        )
+        parser.add_argument(
+            "--replica-selection",
+            choices = ReplicaSelector.POLICIES,
+            default = "ordered",
+            help = "Order in which the replicas of a variable are tried for a read (default: ordered)"
+        )
+        parser.add_argument(
+            "--anti-entropy",
+            type = int,
+            default = 0,
+            help = "Copy N missed variables per tick from peers to a recovered site (default: 0, off)"
+        )
+        parser.add_argument(
+            "--read-cache",
+            type = int,
+            default = 256,
+            help = "Snapshot reads cached per transaction for repeated reads (default: 256, 0 turns the cache off)"
+        )
+        parser.add_argument(
+            "--read-own-writes",
+            action = "store_true",
+            help = "Let an SSI transaction read its own pending write of a variable instead of its snapshot"
+        )
+        parser.add_argument(
+            "--eager-validation",
+            choices = sorted({mode for engine in ENGINES.values() for mode in engine.EAGER_VALIDATION_MODES}),
+            default = None,
+            help = "Check writes against the commit rules when they happen: flag reports a transaction that would "
+                   "abort at commit, abort (2pl only) aborts it at once (default: off)"
+        )
+        parser.add_argument(
+            "--output",
+            choices = sorted(SINKS),
+            default = "text",
+            help = "Output format: text (default), jsonl (one JSON event per line) or quiet (event counts only)"
+        )
+        parser.add_argument(
+            "--site-processes",
+            action = "store_true",
+            help = "Run every site in a worker process of its own and contact replicas in parallel"
+        )
+        parser.add_argument(
+            "--wal-dir",
+            help = "Log every site's changes to a write-ahead log in this directory and restore them on start"
+        )
+        parser.add_argument(
+            "--group-commit",
+            type = int,
+            default = 32,
+            help = "Number of commits that share one fsync of a site's log (default: 32)"
+        )
+        parser.add_argument(
+            "--checkpoint-interval",
+            type = int,
+            default = 10000,
+            help = "Number of log records between checkpoints of a site (default: 10000)"
+        )
+        parser.add_argument(
+            "--profile",
+            action = "store_true",
+            help = "Time the transaction manager's operations and print a report to stderr at the end"
+        )
+        return parser
+
+    @staticmethod
+    def build_transaction_manager(args):
+        """
+        Create the TransactionManager (of the chosen engine) that the parsed command-line flags describe.
+        """
+        catalog = PlacementCatalog(args.sites, args.variables, args.replication_factor, args.placement)
+        sink = SINKS[args.output]()
+        site_mode = "process" if args.site_processes else "local"
+        wal_options = None
+        if args.wal_dir:
+            wal_options = {"directory": args.wal_dir, "group_size": args.group_commit,
+                           "checkpoint_interval": args.checkpoint_interval}
+        engine = ENGINES[args.engine]
+        return engine(gc_enabled = args.gc, catalog = catalog, sink = sink, site_mode = site_mode,
+                      wal_options = wal_options, replica_selection = args.replica_selection,
+                      history_retention = args.history, anti_entropy_batch = args.anti_entropy,
+                      eager_validation = args.eager_validation, read_cache_size = args.read_cache,
+                      read_own_writes = args.read_own_writes)
+
+    @staticmethod
+    def trace_options(input_file):
+        """
+        Return the flags a trace asks for in an options comment among its first comment lines, e.g.
+        `// options: --gc`, so that traces of optional modes run with their flags. Nothing is read from stdin.
+        """
+        if input_file == "-":
+            return []
+        options = []
+        try:
+            with open(input_file, "r") as file:
+                for line in file:
+                    line = line.strip()
+                    if line and not (line.startswith("//") or line.startswith("#")):
+                        break  # The comments at the top are over
+                    match = OPTIONS_PATTERN.match(line)
+                    if match:
+                        options.extend(shlex.split(match.group(1)))
+        except OSError:
+            return []  # main() reports the error
+        return options
+
+
+# Dispatch table from command name to handler
+COMMAND_HANDLERS = {
+    "begin": Main.begin,
+    "beginRO": Main.begin_read_only,
+    "R": Main.read,
+    "W": Main.write,
+    "fail": Main.fail,
+    "recover": Main.recover,
+    "end": Main.end,
+    "dump": Main.dump,
+}
+
+# Concurrency-control engines, by the name --engine selects
+ENGINES = {"ssi": TransactionManager, "2pl": LockingTransactionManager}
 
 
 if __name__ == "__main__":
@@ -89,14 +335,17 @@ if __name__ == "__main__":
     Main.main(input_file)
     """
 
-    # Use argparse to handle command-line arguments
-    parser = argparse.ArgumentParser(description = "Replicated Concurrency Control and Recovery")
-    parser.add_argument(
-        "input_file",
-        type = str,
-        help = "Path to the input file containing transaction commands"
-    )
+    parser = Main.argument_parser()
     args = parser.parse_args()
 
-    # Pass the input file to the main function
-    Main.main(args.input_file)
+    # Flags from the trace's options comment come first, so the ones given on the command line win
+    args = parser.parse_args(Main.trace_options(args.input_file) + sys.argv[1:])
+    if args.eager_validation not in (None,) + ENGINES[args.engine].EAGER_VALIDATION_MODES:
+        parser.error(f"--eager-validation {args.eager_validation} is not supported by the {args.engine} engine")
+    transaction_manager = Main.build_transaction_manager(args)
+
+    instrumentation = Instrumentation().attach(transaction_manager) if args.profile else None
+    Main.main(args.input_file, transaction_manager)
+    if instrumentation is not None:
+        print(instrumentation.report(), file = sys.stderr)
+    transaction_manager.close()
@@ -0,0 +1,376 @@
+"""
+-------------------------------------------------------------------------------
+Author(s): Rahi Krishna (rk4748), Tanmay G. Dadhania (tgd8275)
+Date: October 16, 2026
+
+Description:
+This file runs a single trace in parallel by splitting it into partitions that cannot affect each other.
+Transactions are grouped with the variables they read and write (union-find); a fail of a site joins every
+variable, since any transaction that wrote before the failure aborts at commit, and a recover of a site joins the
+variables stored on it, since the site's failure history decides what those variables' transactions may read. Commands of different partitions touch disjoint transactions, variables and failure
+histories, so each group of partitions runs in its own worker process with its own TransactionManager, keeping
+the original logical timestamps. Dumps are sent to every worker. Each worker closes commit groups where the serial run
+would and also holds the versions that the other workers' transactions keep alive, so dumps of old versions agree.
+The workers' events are merged back into timestamp order and rendered by one sink, so the output is the same as
+a serial run: serialization graphs are rebuilt from the latest graph of every worker (nodes in the order the serial
+graph would hold them), and dumps take each variable's value from the worker that owns it.
+When everything ends up in one partition, e.g. because a site fails, the trace simply runs serially.
+-------------------------------------------------------------------------------
+"""
+
+import io
+import re
+import sys
+import heapq
+import argparse
+from contextlib import redirect_stderr
+from concurrent.futures import ProcessPoolExecutor
+
+from Main import Main, COMMAND_HANDLERS
+from EventSink import EventSink, SINKS
+from PlacementCatalog import PlacementCatalog
+from TransactionManager import TransactionManager
+
+LINE_NUMBER_PATTERN = re.compile(r"Line (\d+):")
+
+
+class RecordingSink(EventSink):
+    """
+    Sink of a worker: records events with the timestamp of the command that emitted them, for the merger.
+    """
+
+    def __init__(self, wanted_events):
+        super().__init__()
+        self.wanted_events = wanted_events  # Costly events the final sink renders
+        self.records = []                   # (timestamp, kind, payload) in emission order
+        self.timestamp = 0                  # Timestamp of the command being executed
+        self.births = {}                    # Graph node -> (timestamp, sequence) it was added to the graph at
+        self.sequence = 0
+
+    def wants(self, event):
+        return event not in self.LAZY_EVENTS or event in self.wanted_events
+
+    def emit(self, event, **fields):
+        if event == "graph":
+            self.records.append((self.timestamp, "graph", self.snapshot(fields["graph"])))
+        elif event == "dump":
+            self.records.append((self.timestamp, "dump", fields))
+        else:
+            self.records.append((self.timestamp, "event", (event, fields)))
+
+    def snapshot(self, graph):
+        """
+        Copy the graph, noting when each node that is new since the last snapshot was added.
+        """
+        for from_tid in graph:
+            if from_tid not in self.births:
+                self.sequence += 1
+                self.births[from_tid] = (self.timestamp, self.sequence)
+        for from_tid in [tid for tid in self.births if tid not in graph]:
+            del self.births[from_tid]
+        return {from_tid: (self.births[from_tid], {to_tid: list(edge_types) for to_tid, edge_types in edges.items()})
+                for from_tid, edges in graph.items()}
+
+
+def run_partition(commands, catalog_config, wanted_events, group_ends=None, external_lifetimes=()):
+    """
+    Worker: run the commands of a group of partitions, given as (line_number, timestamp, command, args).
+    group_ends maps the timestamp of every end command to the timestamp of the last end of its commit group in the
+    whole trace. external_lifetimes are the (start, end) timestamps of the other workers' transactions (end None if
+    they never end); they are entered in the active set so that versions are retained as in a serial run.
+    Returns the recorded events and the error lines as (line_number, text).
+    """
+    sink = RecordingSink(wanted_events)
+    transaction_manager = TransactionManager(catalog = PlacementCatalog(*catalog_config), sink = sink)
+    errors = []
+
+    lifetime_events = sorted(
+        [(start, ("external", number), True) for number, (start, _) in enumerate(external_lifetimes)] +
+        [(end, ("external", number), False) for number, (_, end) in enumerate(external_lifetimes) if end is not None]
+    )
+    next_event = 0
+
+    def advance(time):
+        # Start and end the other workers' transactions up to the given time
+        nonlocal next_event
+        while next_event < len(lifetime_events) and lifetime_events[next_event][0] <= time:
+            event_time, key, started = lifetime_events[next_event]
+            if started:
+                transaction_manager.active_start_times[key] = event_time
+                heapq.heappush(transaction_manager.active_heap, (event_time, key))
+            else:
+                del transaction_manager.active_start_times[key]
+            next_event += 1
+
+    group_end = None  # Timestamp at which the open commit group ends in the whole trace
+    for line_number, timestamp, command, args in commands:
+        if group_end is not None and timestamp > group_end:
+            advance(group_end)
+            transaction_manager.end_commit_group(group_end)
+            group_end = None
+        advance(timestamp - 1)
+        if command == "end" and group_end is None:
+            transaction_manager.begin_commit_group()
+            group_end = group_ends[timestamp]
+
+        sink.timestamp = timestamp
+        try:
+            COMMAND_HANDLERS[command](transaction_manager, args, timestamp)
+        except Exception as e:
+            errors.append((line_number, f"Line {line_number}: Error: {e}"))
+
+        # Commits change the graph even when it is not printed (e.g., a cycle abort removes a node)
+        if command == "end" and "graph" in wanted_events:
+            sink.records.append((timestamp, "graph_state", sink.snapshot(transaction_manager.serialization_graph)))
+
+    if group_end is not None:
+        advance(group_end)
+        transaction_manager.end_commit_group(group_end)
+    return sink.records, errors
+
+
+class ParallelRunner:
+    def __init__(self, catalog=None, workers=None):
+        self.catalog = catalog if catalog is not None else PlacementCatalog()
+        self.workers = workers              # Worker processes (default: CPUs)
+        self.partitions = 0                 # Number of independent partitions found in the last trace
+
+    def classify(self, command, args):
+        """
+        Return the union-find keys a command belongs to: None for commands sent to every worker, and an empty
+        list for commands that cannot change any state (they fail before doing anything).
+        """
+        if command == "dump":
+            return None
+        try:
+            if command in ("begin", "beginRO", "end"):
+                return [("T", int(args[0][1:]))]
+            if command in ("R", "W"):
+                if command == "W":
+                    int(args[2])
+                variable = self.catalog.variable_name(int(args[1][1:]))
+                return [("T", int(args[0][1:])), ("x", variable)]
+            if command in ("fail", "recover"):
+                return [("S", int(args[0]))]
+        except (IndexError, ValueError):
+            pass
+        return []
+
+    def partition(self, commands):
+        """
+        Split (line_number, timestamp, command, args) commands into independent partitions.
+        Returns the list of partitions (lists of commands) and the commands sent to every worker.
+        """
+        parents = {}
+
+        def find(key):
+            root = key
+            while parents.setdefault(root, root) != root:
+                root = parents[root]
+            while parents[key] != root:  # Path compression
+                parents[key], key = root, parents[key]
+            return root
+
+        def union(first, second):
+            parents[find(first)] = find(second)
+
+        keyed = []
+        broadcast = []
+        sites_joined = set()
+        for entry in commands:
+            keys = self.classify(entry[2], entry[3])
+            if keys is None:
+                broadcast.append(entry)
+                continue
+            if not keys:
+                keys = [("misc",)]
+            for key in keys[1:]:
+                union(keys[0], key)
+            for key in keys:
+                if key[0] == "S" and (key, entry[2] == "fail") not in sites_joined:
+                    # A failure can abort any writer; a recovery affects reads of the variables stored on the site
+                    sites_joined.add((key, entry[2] == "fail"))
+                    for variable in self.catalog.variables:
+                        if entry[2] == "fail" or key[1] in self.catalog.sites_for(variable):
+                            union(key, ("x", variable))
+            keyed.append((keys[0], entry))
+
+        partitions = {}
+        for key, entry in keyed:
+            partitions.setdefault(find(key), []).append(entry)
+        return list(partitions.values()), broadcast
+
+    def run(self, lines, sink):
+        """
+        Run the trace lines, render the merged output through sink, and return the error lines.
+        """
+        captured = io.StringIO()
+        with redirect_stderr(captured):
+            parsed = list(Main.parse(lines))
+        errors = [(int(LINE_NUMBER_PATTERN.match(text).group(1)), text) for text in captured.getvalue().splitlines()]
+
+        # Consecutive end commands form a commit group (see Main.execute); note where each group ends
+        group_ends = {}
+        group_end = None
+        for timestamp in range(len(parsed), 0, -1):
+            if parsed[timestamp - 1][1] != "end":
+                group_end = None
+                continue
+            group_end = group_end or timestamp
+            group_ends[timestamp] = group_end
+
+        commands = []
+        for timestamp, (line_number, command, args) in enumerate(parsed, start = 1):
+            if command in COMMAND_HANDLERS:
+                commands.append((line_number, timestamp, command, args))
+            else:
+                errors.append((line_number, f"Line {line_number}: Unknown command: {command}"))
+
+        partitions, broadcast = self.partition(commands)
+        self.partitions = len(partitions)
+        if len(partitions) < 2:
+            return self.run_serially(lines, sink)
+
+        # Spread partitions over the workers, largest first, each to the worker with the fewest commands so far
+        worker_count = min(self.workers or len(partitions), len(partitions))
+        groups = [[] for _ in range(worker_count)]
+        for partition in sorted(partitions, key = len, reverse = True):
+            min(groups, key = len).extend(partition)
+        groups = [sorted(group + broadcast, key = lambda entry: entry[1]) for group in groups]
+
+        wanted_events = [event for event in EventSink.LAZY_EVENTS if sink.wants(event)]
+        lifetimes = [self.lifetimes(group) for group in groups]
+        external_lifetimes = [[lifetime for other, other_lifetimes in enumerate(lifetimes) if other != worker
+                               for lifetime in other_lifetimes] for worker in range(worker_count)]
+        with ProcessPoolExecutor(max_workers = worker_count) as pool:
+            results = list(pool.map(run_partition, groups, [self.catalog.config()] * worker_count,
+                                    [wanted_events] * worker_count, [group_ends] * worker_count,
+                                    external_lifetimes))
+
+        owners = self.owners(groups)
+        self.merge([records for records, _ in results], owners, sink)
+        for _, worker_errors in results:
+            errors.extend(worker_errors)
+        errors.sort(key = lambda error: error[0])
+        return [text for _, text in errors]
+
+    def run_serially(self, lines, sink):
+        """
+        Run the trace with a single TransactionManager, as Main does, and return the error lines.
+        """
+        captured = io.StringIO()
+        with redirect_stderr(captured):
+            Main.execute(Main.parse(lines), TransactionManager(catalog = self.catalog, sink = sink))
+        return captured.getvalue().splitlines()
+
+    def lifetimes(self, group):
+        """
+        Return the (start, end) timestamps during which the transactions of a group are active, as the
+        TransactionManager sees it: from a begin until the transaction's next begin or end (end None if neither).
+        """
+        lifetimes = []
+        current = {}  # transaction_id -> position in lifetimes of its active lifetime
+        for _, timestamp, command, args in group:
+            keys = self.classify(command, args)
+            if not keys or command not in ("begin", "beginRO", "end"):
+                continue
+            transaction_id = keys[0][1]
+            if transaction_id in current:
+                position = current.pop(transaction_id)
+                lifetimes[position] = (lifetimes[position][0], timestamp)
+            if command != "end":
+                current[transaction_id] = len(lifetimes)
+                lifetimes.append((timestamp, None))
+        return lifetimes
+
+    def owners(self, groups):
+        """
+        Return which worker owns each variable and each failed/recovered site, for merging dumps.
+        """
+        owners = {}
+        for worker, group in enumerate(groups):
+            for _, _, command, args in group:
+                keys = self.classify(command, args)
+                for key in keys or ():
+                    if key[0] == "x":
+                        owners[key[1]] = worker
+                    elif key[0] == "S":
+                        owners[key] = worker
+        return owners
+
+    def merge(self, worker_records, owners, sink):
+        """
+        Emit the workers' events to the sink in timestamp order, combining graphs and dumps.
+        """
+        graphs = [{} for _ in worker_records]  # Latest graph of every worker
+        streams = [[(timestamp, worker, kind, payload) for timestamp, kind, payload in records]
+                   for worker, records in enumerate(worker_records)]
+        pending_dumps = {}                     # worker -> dump fields, for the dump being merged
+        for timestamp, worker, kind, payload in heapq.merge(*streams, key = lambda record: (record[0], record[1])):
+            if kind == "dump":
+                pending_dumps[worker] = payload
+                if len(pending_dumps) == len(worker_records):
+                    sink.emit("dump", sites = self.merge_dumps(pending_dumps, owners), as_of = payload["as_of"],
+                              delta = payload["delta"])
+                    pending_dumps = {}
+            elif kind == "graph_state":
+                graphs[worker] = payload
+            elif kind == "graph":
+                graphs[worker] = payload
+                nodes = sorted((node for graph in graphs for node in graph.items()), key = lambda item: item[1][0])
+                sink.emit("graph", graph = {from_tid: edges for from_tid, (_, edges) in nodes})
+            else:
+                event, fields = payload
+                sink.emit(event, **fields)
+
+    def merge_dumps(self, dumps, owners):
+        """
+        Build one dump from the workers' dumps: each variable's value comes from the worker that owns it, and each
+        site's status from the worker that ran its failures and recoveries. Variables and sites nobody owns are the
+        same in every worker. Delta dumps list different sites in different workers.
+        """
+        merged = {}  # site_id -> (status, {variable: value}), in the order of the dump
+        for worker in sorted(dumps):
+            for site_id, status, variables in dumps[worker]["sites"]:
+                site_owner = owners.get(("S", site_id), worker)
+                if site_id not in merged:
+                    merged[site_id] = (status, {})
+                elif site_owner == worker:
+                    merged[site_id] = (status, merged[site_id][1])
+                values = merged[site_id][1]
+                for variable, value in variables:
+                    if owners.get(variable, worker) == worker and variable not in values:
+                        values[variable] = value
+
+        site_ids = sorted(merged) if dumps[0]["delta"] else list(merged)
+        variable_index = self.catalog.variable_index
+        return [(site_id, merged[site_id][0],
+                 sorted(merged[site_id][1].items(), key = lambda item: variable_index.get(item[0], 0)))
+                for site_id in site_ids]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Run one trace in parallel, split into independent partitions")
+    parser.add_argument("input_file", help = "Path to the trace file, or - to read from stdin")
+    parser.add_argument("--workers", type = int, default = None, help = "Number of worker processes (default: CPUs)")
+    parser.add_argument("--sites", type = int, default = 10, help = "Number of sites (default: 10)")
+    parser.add_argument("--variables", type = int, default = 20, help = "Number of variables (default: 20)")
+    parser.add_argument("--replication-factor", type = int, default = None, help = "Copies of replicated variables")
+    parser.add_argument("--placement", choices = PlacementCatalog.POLICIES, default = "modulo",
+                        help = "Replica placement policy (default: modulo)")
+    parser.add_argument("--output", choices = sorted(SINKS), default = "text", help = "Output format (default: text)")
+    args = parser.parse_args()
+
+    if args.input_file == "-":
+        trace_lines = sys.stdin.readlines()
+    else:
+        with open(args.input_file) as trace_file:
+            trace_lines = trace_file.readlines()
+
+    output_sink = SINKS[args.output]()
+    runner = ParallelRunner(PlacementCatalog(args.sites, args.variables, args.replication_factor, args.placement),
+                            args.workers)
+    error_lines = runner.run(trace_lines, output_sink)
+    output_sink.close()
+    for error_line in error_lines:
+        print(error_line, file = sys.stderr)
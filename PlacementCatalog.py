@@ -0,0 +1,128 @@
+"""
+-------------------------------------------------------------------------------
+Author(s): Rahi Krishna (rk4748), Tanmay G. Dadhania (tgd8275)
+Date: October 16, 2026
+
+Description:
+This file defines the PlacementCatalog class, which describes the topology of the system: the sites, the variables,
+and the sites holding a replica of each variable.
+Replica lists are precomputed once, so every component looks up the placement of a variable with a single dict access.
+Supported placement policies:
+- "modulo": the original rule. Odd-indexed variables live on site 1 + (i % sites); even-indexed variables are
+  replicated on every site, or on replication_factor consecutive sites starting at that home site.
+- "consistent_hash": each variable is placed on replication_factor distinct sites found by walking a hash ring.
+- "full": every variable is replicated on every site.
+-------------------------------------------------------------------------------
+"""
+
+import hashlib
+from bisect import bisect_right
+
+
+class PlacementCatalog:
+    POLICIES = ("modulo", "consistent_hash", "full")
+
+    def __init__(self, num_sites=10, num_variables=20, replication_factor=None, policy="modulo", virtual_nodes=64):
+        if policy not in self.POLICIES:
+            raise Exception(f"Unknown placement policy {policy}; expected one of {', '.join(self.POLICIES)}.")
+        if num_sites < 1 or num_variables < 0:
+            raise Exception("The topology needs at least one site and a non-negative number of variables.")
+        if replication_factor is not None and not 1 <= replication_factor <= num_sites:
+            raise Exception(f"Replication factor must be between 1 and {num_sites}.")
+
+        self.num_sites = num_sites
+        self.num_variables = num_variables
+        self.replication_factor = replication_factor
+        self.policy = policy
+        self.virtual_nodes = virtual_nodes
+        self.site_ids = list(range(1, num_sites + 1))
+
+        self.variables = [f"x{i}" for i in range(1, num_variables + 1)]  # Variable names in index order
+        self.variable_index = {variable: i for i, variable in enumerate(self.variables, start = 1)}
+        self.replicas = {}  # variable -> tuple of site ids holding it, in read-preference order
+
+        if policy == "modulo":
+            self.place_modulo()
+        elif policy == "consistent_hash":
+            self.place_consistent_hash(virtual_nodes)
+        else:
+            all_sites = tuple(self.site_ids)
+            self.replicas = dict.fromkeys(self.variables, all_sites)
+
+    def place_modulo(self):
+        """
+        Place odd-indexed variables on their home site and replicate even-indexed ones.
+        """
+        all_sites = tuple(self.site_ids)
+        for variable, i in self.variable_index.items():
+            home_site = 1 + (i % self.num_sites)
+            if i % 2 != 0:
+                self.replicas[variable] = (home_site,)
+            elif self.replication_factor is None or self.replication_factor == self.num_sites:
+                self.replicas[variable] = all_sites
+            else:
+                self.replicas[variable] = tuple(
+                    1 + (home_site - 1 + offset) % self.num_sites for offset in range(self.replication_factor)
+                )
+
+    def place_consistent_hash(self, virtual_nodes):
+        """
+        Place every variable on the first replication_factor distinct sites clockwise from its hash on the ring.
+        """
+        replication_factor = self.replication_factor or min(3, self.num_sites)
+        ring = sorted(
+            (self.stable_hash(f"site-{site_id}-{vnode}"), site_id)
+            for site_id in self.site_ids
+            for vnode in range(virtual_nodes)
+        )
+        ring_hashes = [point for point, _ in ring]
+
+        for variable in self.variables:
+            position = bisect_right(ring_hashes, self.stable_hash(variable))
+            chosen = []
+            while len(chosen) < replication_factor:
+                site_id = ring[position % len(ring)][1]
+                if site_id not in chosen:
+                    chosen.append(site_id)
+                position += 1
+            self.replicas[variable] = tuple(chosen)
+
+    @staticmethod
+    def stable_hash(key):
+        """
+        Hash a string to a 64-bit integer that is the same in every process.
+        """
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size = 8).digest(), "big")
+
+    def config(self):
+        """
+        Return the constructor arguments of this catalog, so another process can build an identical one.
+        """
+        return (self.num_sites, self.num_variables, self.replication_factor, self.policy, self.virtual_nodes)
+
+    def variable_name(self, index):
+        """
+        Return the name of the variable with the given index. Names of catalog variables are shared string
+        objects, so the many sets and dicts keyed by a variable do not each hold a copy of its name.
+        """
+        if 1 <= index <= self.num_variables:
+            return self.variables[index - 1]
+        return f"x{index}"
+
+    def sites_for(self, variable):
+        """
+        Return the sites holding a variable, or an empty tuple if the variable does not exist.
+        """
+        return self.replicas.get(variable, ())
+
+    def is_replicated(self, variable):
+        """
+        Return True if the variable has copies on more than one site.
+        """
+        return len(self.replicas.get(variable, ())) > 1
+
+    def initial_value(self, variable):
+        """
+        Return the value a variable holds before any transaction writes it.
+        """
+        return 10 * self.variable_index[variable]
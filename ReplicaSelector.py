@@ -0,0 +1,56 @@
+"""
+-------------------------------------------------------------------------------
+Author(s): Rahi Krishna (rk4748), Tanmay G. Dadhania (tgd8275)
+Date: October 16, 2026
+
+Description:
+This file defines the ReplicaSelector class, which decides the order in which the replicas of a variable are tried
+for a read. The TransactionManager still applies its snapshot-validity rules to every replica it tries; the
+selector only changes which valid replica serves the read, and counts the reads served by each site.
+Supported policies:
+- "ordered": the original behaviour, replicas in catalog order (site 1 first for fully replicated variables).
+- "round_robin": every read of a variable starts one replica further along than the previous one.
+- "least_loaded": replicas that have served the fewest reads first.
+- "last_known_good": the replica that last served a valid read of the variable first, then catalog order.
+-------------------------------------------------------------------------------
+"""
+
+
+class ReplicaSelector:
+    POLICIES = ("ordered", "round_robin", "least_loaded", "last_known_good")
+
+    def __init__(self, site_ids, policy="ordered"):
+        if policy not in self.POLICIES:
+            raise Exception(f"Unknown replica selection policy {policy}; expected one of {', '.join(self.POLICIES)}.")
+
+        self.policy = policy
+        self.load = dict.fromkeys(site_ids, 0)  # Reads served by each site
+        self.next_start = {}                    # round_robin: variable -> position of the replica to try first
+        self.last_good = {}                     # last_known_good: variable -> site that last served a valid read
+
+    def order(self, variable, replicas):
+        """
+        Return the replicas of a variable in the order they should be tried.
+        """
+        if self.policy == "ordered" or len(replicas) < 2:
+            return replicas
+
+        if self.policy == "round_robin":
+            start = self.next_start.get(variable, 0) % len(replicas)
+            self.next_start[variable] = start + 1
+            return replicas[start:] + replicas[:start]
+
+        if self.policy == "least_loaded":
+            return sorted(replicas, key = self.load.__getitem__)  # Stable: ties keep catalog order
+
+        last_good = self.last_good.get(variable)
+        if last_good is None or last_good == replicas[0]:
+            return replicas
+        return (last_good,) + tuple(site_id for site_id in replicas if site_id != last_good)
+
+    def record_read(self, variable, site_id):
+        """
+        Count a read served by a site.
+        """
+        self.load[site_id] += 1
+        self.last_good[variable] = site_id
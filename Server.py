@@ -0,0 +1,234 @@
+"""
+-------------------------------------------------------------------------------
+Author(s): Rahi Krishna (rk4748), Tanmay G. Dadhania (tgd8275)
+Date: October 16, 2026
+
+Description:
+This file implements an asyncio server that lets many clients drive one TransactionManager over TCP or a Unix
+socket, using the same command language as the trace files.
+Protocol: a client sends one command per line and may pipeline as many commands as it likes. For every command the
+server sends the output lines the command produced, followed by a status line: ". ok" or ". error: <message>".
+Output that belongs to a transaction (e.g., a read that completes when a site recovers) is sent to the connection
+that owns the transaction, possibly between the replies of that connection's own commands.
+A transaction belongs to the connection that began it; other connections cannot operate on it. When that
+connection closes, the transaction's output is dropped until another connection operates on it and takes it over.
+Events about the whole system rather than the command's transactions (the serialization graph, which holds every
+connection's transactions, and anti-entropy catch-ups) are not sent to clients.
+Commands are executed one at a time on the event loop, with one logical clock shared by all connections.
+With --replay, a script of `<connection>: <command>` lines is run without sockets and everything each connection
+would receive is printed; the server's tests use this. A `<connection>: close` line closes that connection.
+-------------------------------------------------------------------------------
+"""
+
+import sys
+import asyncio
+import argparse
+
+from Main import COMMAND_PATTERN, COMMAND_HANDLERS
+from EventSink import EventSink, TextSink
+from TransactionManager import TransactionManager
+
+
+class ConnectionStream:
+    """
+    File-like adapter that sends rendered output to a client connection.
+    """
+
+    def __init__(self, writer):
+        self.writer = writer
+
+    def write(self, text):
+        if not self.writer.is_closing():
+            self.writer.write(text.encode())
+
+    def flush(self):
+        pass
+
+
+class ReplayWriter:
+    """
+    Stand-in for a connection's writer when replaying a script: prints what the connection receives, each line
+    prefixed with the connection's name.
+    """
+
+    def __init__(self, name, stream):
+        self.name = name
+        self.stream = stream
+
+    def is_closing(self):
+        return False
+
+    def write(self, data):
+        for line in data.decode().splitlines():
+            self.stream.write(f"{self.name}> {line}".rstrip() + "\n")
+
+
+class RoutingSink(EventSink):
+    """
+    Sink that renders events as text and sends them to the connection that owns the transaction, or to the
+    connection whose command is running if the event is not about a transaction. Events of a transaction whose
+    connection has closed are dropped.
+    """
+    GLOBAL_EVENTS = ("graph", "catch_up")  # Events about the whole system, which no single connection owns
+
+    def __init__(self, owners):
+        super().__init__()
+        self.owners = owners        # transaction_id -> connection writer
+        self.current = None         # Writer of the connection whose command is running
+        self.sinks = {}             # writer -> TextSink
+
+    def wants(self, event):
+        return event not in self.GLOBAL_EVENTS
+
+    def sink_for(self, writer):
+        sink = self.sinks.get(writer)
+        if sink is None:
+            sink = self.sinks[writer] = TextSink(ConnectionStream(writer))
+            sink.before_flush = self.before_flush
+        return sink
+
+    def emit(self, event, **fields):
+        if "transaction_id" in fields:
+            writer = self.owners.get(fields["transaction_id"])
+        else:
+            writer = self.current
+        if writer is not None:
+            self.sink_for(writer).emit(event, **fields)
+
+    def flush(self):
+        for sink in self.sinks.values():
+            sink.flush()
+
+    def forget(self, writer):
+        self.sinks.pop(writer, None)
+
+
+class TransactionServer:
+    TRANSACTION_COMMANDS = ("begin", "beginRO", "R", "W", "end")  # Commands whose first argument is a transaction
+
+    def __init__(self, transaction_manager=None):
+        self.owners = {}                # transaction_id -> writer of the owning connection
+        self.sink = RoutingSink(self.owners)
+        if transaction_manager is None:
+            transaction_manager = TransactionManager(sink = self.sink)
+        else:
+            # Keep the hook the manager set on its own sink (e.g., forcing the logs to disk before a commit is
+            # reported); the connections' sinks call it before they send anything
+            self.sink.before_flush = transaction_manager.sink.before_flush
+            transaction_manager.sink = self.sink
+        self.transaction_manager = transaction_manager
+        self.timestamp = transaction_manager.restored_time + 1  # Logical clock shared by all connections
+
+    def execute(self, line, writer):
+        """
+        Run one command line for a connection and return its status line.
+        """
+        match = COMMAND_PATTERN.match(line)
+        if not match:
+            return f". error: Invalid command format: {line}\n"
+
+        command, args = match.groups()
+        args = [arg.strip() for arg in args.split(",")] if args else []
+        handler = COMMAND_HANDLERS.get(command)
+        if handler is None:
+            return f". error: Unknown command: {command}\n"
+
+        try:
+            if command in self.TRANSACTION_COMMANDS:
+                transaction_id = int(args[0][1:])
+                owner = self.owners.get(transaction_id)
+                if owner is None:
+                    self.owners[transaction_id] = writer
+                elif owner is not writer:
+                    return f". error: Transaction T{transaction_id} belongs to another connection.\n"
+
+            self.sink.current = writer
+            self.transaction_manager.tick(self.timestamp)
+            handler(self.transaction_manager, args, self.timestamp)
+            return ". ok\n"
+        except Exception as e:
+            return f". error: {e}\n"
+        finally:
+            self.timestamp += 1
+            self.sink.flush()
+            self.sink.current = None
+
+    async def handle_client(self, reader, writer):
+        """
+        Serve one connection: execute its commands in order and stream the replies back.
+        """
+        try:
+            while True:
+                data = await reader.readline()
+                if not data:
+                    break
+                line = data.decode().strip()
+                if not line or line.startswith("//") or line.startswith("#"):
+                    continue
+                writer.write(self.execute(line, writer).encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.disconnect(writer)
+            writer.close()
+
+    def disconnect(self, writer):
+        """
+        Forget a closed connection. Its transactions stay in the system, but nobody owns them anymore.
+        """
+        for transaction_id in [tid for tid, owner in self.owners.items() if owner is writer]:
+            del self.owners[transaction_id]
+        self.sink.forget(writer)
+
+    def replay(self, lines, stream=None):
+        """
+        Run `<connection>: <command>` lines as if each named connection had sent its commands in this order, and
+        print what every connection receives.
+        """
+        stream = stream if stream is not None else sys.stdout
+        writers = {}  # Connection name -> ReplayWriter
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("//") or line.startswith("#"):
+                continue
+            name, _, command = line.partition(":")
+            name, command = name.strip(), command.strip()
+            if command == "close":
+                if name in writers:
+                    self.disconnect(writers.pop(name))
+                continue
+            writer = writers.get(name)
+            if writer is None:
+                writer = writers[name] = ReplayWriter(name, stream)
+            writer.write(self.execute(command, writer).encode())
+
+    async def serve(self, host="127.0.0.1", port=8765, unix_socket=None):
+        if unix_socket:
+            server = await asyncio.start_unix_server(self.handle_client, path = unix_socket)
+            print(f"Listening on {unix_socket}", file = sys.stderr)
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+            print(f"Listening on {host}:{port}", file = sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Serve the transaction manager over a socket")
+    parser.add_argument("--host", default = "127.0.0.1", help = "Host to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type = int, default = 8765, help = "TCP port to listen on (default: 8765)")
+    parser.add_argument("--unix-socket", help = "Listen on this Unix socket path instead of TCP")
+    parser.add_argument("--gc", action = "store_true", help = "Enable garbage collection of finished transactions")
+    parser.add_argument("--replay", help = "Run a script of '<connection>: <command>' lines instead of listening")
+    args = parser.parse_args()
+
+    transaction_server = TransactionServer(TransactionManager(gc_enabled = args.gc))
+    if args.replay:
+        with open(args.replay) as script:
+            transaction_server.replay(script)
+        sys.exit(0)
+    try:
+        asyncio.run(transaction_server.serve(args.host, args.port, args.unix_socket))
+    except KeyboardInterrupt:
+        pass
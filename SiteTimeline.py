@@ -0,0 +1,48 @@
+"""
+-------------------------------------------------------------------------------
+Author(s): Rahi Krishna (rk4748), Tanmay G. Dadhania (tgd8275)
+Date: October 16, 2026
+
+Description:
+This file defines the SiteTimeline class, which records the failure and recovery events of a single site.
+Event times are kept in sorted lists so that availability questions asked on every read and commit
+(e.g., "was this site down between a and b?") are answered by binary search instead of a scan of the history.
+-------------------------------------------------------------------------------
+"""
+
+from bisect import bisect_right, insort
+
+
+class SiteTimeline:
+    def __init__(self):
+        self.events = []                # Failure/recovery events in order: list of (timestamp, "down"/"up")
+        self.event_times = []           # Sorted times of all events
+        self.failure_times = []         # Sorted times of "down" events
+        self.last_recovery_time = None  # Time of the latest "up" event, if any
+
+    def record(self, timestamp, status):
+        """
+        Record a failure ("down") or recovery ("up") event at the given timestamp.
+        """
+        self.events.append((timestamp, status))
+        insort(self.event_times, timestamp)
+
+        if status == "down":
+            insort(self.failure_times, timestamp)
+        elif self.last_recovery_time is None or timestamp > self.last_recovery_time:
+            self.last_recovery_time = timestamp
+
+    def was_down_between(self, start, end):
+        """
+        Return True if a failure or recovery event lies strictly between start and end.
+        Either event means the site was down for part of the interval.
+        """
+        index = bisect_right(self.event_times, start)
+        return index < len(self.event_times) and self.event_times[index] < end
+
+    def first_failure_after(self, timestamp):
+        """
+        Return the time of the earliest failure strictly after the given timestamp, or None.
+        """
+        index = bisect_right(self.failure_times, timestamp)
+        return self.failure_times[index] if index < len(self.failure_times) else None
@@ -0,0 +1,159 @@
+"""
+-------------------------------------------------------------------------------
+Author(s): Rahi Krishna (rk4748), Tanmay G. Dadhania (tgd8275)
+Date: October 16, 2026
+
+Description:
+This file runs DataManager sites in worker processes.
+Each RemoteSite starts one process that owns a DataManager and serves method calls sent over a pipe. RemoteSite
+exposes the DataManager interface the TransactionManager uses; the current values, latest commit times and status
+of its site are mirrored locally (the TransactionManager is the only writer), so only reads of old versions and
+mutations cross the pipe. fan_out() sends a batch of calls to many sites before waiting for any reply, so the
+sites work on them in parallel.
+-------------------------------------------------------------------------------
+"""
+
+import multiprocessing
+
+from DataManager import DataManager
+from PlacementCatalog import PlacementCatalog
+
+
+def serve_site(connection, site_id, catalog_config, wal_options=None):
+    """
+    Worker process loop: execute DataManager calls received on the connection until told to stop.
+    """
+    data_manager = DataManager(site_id, PlacementCatalog(*catalog_config), wal_options)
+    while True:
+        method, args = connection.recv()
+        if method == "stop":
+            data_manager.close()
+            break
+        try:
+            if method == "get":
+                result = getattr(data_manager, args[0])
+            else:
+                result = getattr(data_manager, method)(*args)
+            connection.send(("ok", result))
+        except Exception as e:
+            connection.send(("error", str(e)))
+    connection.close()
+
+
+class RemoteSite:
+    def __init__(self, site_id, catalog, wal_options=None):
+        self.site_id = site_id
+        self.catalog = catalog
+        self.status = "up"
+        self.variables = {}                 # Mirror of the site's current committed values
+        self.latest_commit_times = {}       # Mirror of the newest commit time of each variable
+
+        self.connection, worker_connection = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target = serve_site, args = (worker_connection, site_id, catalog.config(), wal_options), daemon = True
+        )
+        self.process.start()
+        worker_connection.close()
+
+        # A site restored from its write-ahead log starts with state of its own
+        if wal_options is not None:
+            self.status = self.call("get", "status")
+            for variable, history in self.version_history.items():
+                self.mirror_writes([(variable, history[-1][0], history[-1][1])])
+
+    def send(self, method, *args):
+        self.connection.send((method, args))
+
+    def receive(self, method, *args):
+        """
+        Wait for the reply to a call sent earlier, updating the local mirror if the call changed the site.
+        """
+        outcome, result = self.connection.recv()
+        if outcome == "error":
+            raise Exception(result)
+        if method == "write_batch":
+            self.mirror_writes(args[0])
+        elif method == "fail":
+            self.status = "down"
+        elif method == "recover":
+            self.status = "up"
+        return result
+
+    def call(self, method, *args):
+        self.send(method, *args)
+        return self.receive(method, *args)
+
+    def read_version(self, variable, start_time):
+        if self.status != "up":
+            raise Exception(f"Site {self.site_id} is down, cannot read {variable}.")
+        return self.call("read_version", variable, start_time)
+
+    def read(self, variable, start_time):
+        return self.read_version(variable, start_time)[0]
+
+    def get_last_commit(self, variable, start_time):
+        return self.call("get_last_commit", variable, start_time)
+
+    def values_as_of(self, variables, timestamp):
+        return self.call("values_as_of", variables, timestamp)
+
+    def version_chains(self, variables):
+        return self.call("version_chains", variables)
+
+    def latest_commit_time(self, variable):
+        return self.latest_commit_times.get(variable)
+
+    def write(self, variable, value, commit_time, gc_watermark=None):
+        self.write_batch([(variable, value, commit_time)], gc_watermark)
+
+    def write_batch(self, writes, gc_watermark=None):
+        self.call("write_batch", writes, gc_watermark)
+
+    def mirror_writes(self, writes):
+        """
+        Update the local mirror after the worker applied a batch of writes.
+        """
+        for variable, value, commit_time in writes:
+            if commit_time >= self.latest_commit_times.get(variable, commit_time):
+                self.variables[variable] = value
+                self.latest_commit_times[variable] = commit_time
+
+    def sync_log(self):
+        self.call("sync_log")
+
+    def fail(self):
+        self.call("fail")
+
+    def recover(self):
+        self.call("recover")
+
+    @property
+    def version_history(self):
+        return self.call("get", "version_history")
+
+    def close(self):
+        if self.process.is_alive():
+            self.send("stop")
+            self.process.join()
+        self.connection.close()
+
+
+def fan_out(calls):
+    """
+    Run a list of (site, method, args) calls and return their outcomes in order, as (True, result) or
+    (False, exception). Calls to RemoteSites are all sent before any reply is awaited; local sites run inline.
+    """
+    for site, method, args in calls:
+        if isinstance(site, RemoteSite):
+            site.send(method, *args)
+
+    outcomes = []
+    for site, method, args in calls:
+        try:
+            if isinstance(site, RemoteSite):
+                outcomes.append((True, site.receive(method, *args)))
+            else:
+                outcomes.append((True, getattr(site, method)(*args)))
+        except Exception as e:
+            outcomes.append((False, e))
+    return outcomes
@@ -8,18 +8,24 @@ This file defines the Transaction class, encapsulating the state and behavior of
 It tracks transaction metadata (e.g., ID, start time, status), read and write sets, and whether the transaction is
 read-only.
 It provides methods to add read/write intentions and manage the transaction's lifecycle.
+It also keeps a bounded cache of the snapshot reads it has made, so repeated reads of a variable skip the replicas.
 -------------------------------------------------------------------------------
 """
 
 class Transaction:
+    __slots__ = ("transaction_id", "start_time", "commit_time", "is_read_only", "read_set", "write_set", "status",
+                 "abort_reason", "read_cache")
+
     def __init__(self, transaction_id, start_time, is_read_only=False):
         self.transaction_id = transaction_id
         self.start_time = start_time        # Logical start time of the transaction
         self.commit_time = None             # Commit time of the current transaction
         self.is_read_only = is_read_only    # Whether the transaction is read-only
         self.read_set = set()               # Variables read by this transaction
-        self.write_set = {}                 # Variables written by this transaction: variable -> value
+        self.write_set = {}                 # Variables written by this transaction: variable -> (value, timestamp)
         self.status = "active"              # Status of the transaction: "active", "committed", or "aborted"
+        self.abort_reason = None            # Cause of the abort while the transaction is aborted
+        self.read_cache = {}                # Snapshot reads: variable -> (value, site_id, epoch), oldest use first
 
     def add_read(self, variable):
         """
@@ -34,4 +40,26 @@ class Transaction:
         Add a variable and its value to the transaction's write set.
         Overwrites any previous value for the same variable in the write set.
         """
-        self.write_set[variable] = [value,timestamp]
+        self.write_set[variable] = (value, timestamp)
+
+    def cached_read(self, variable, epoch):
+        """
+        Return the cached (value, site_id, epoch) of a snapshot read, or None if the variable is not cached or the
+        entry was made under another epoch.
+        """
+        entry = self.read_cache.pop(variable, None)
+        if entry is None or entry[2] != epoch:
+            return None
+        self.read_cache[variable] = entry  # Move to the most recently used end
+        return entry
+
+    def cache_read(self, variable, value, site_id, epoch, capacity):
+        """
+        Cache a snapshot read, evicting the least recently used entry once the cache holds capacity entries.
+        """
+        if capacity <= 0:
+            return
+        self.read_cache.pop(variable, None)
+        if len(self.read_cache) >= capacity:
+            del self.read_cache[next(iter(self.read_cache))]
+        self.read_cache[variable] = (value, site_id, epoch)
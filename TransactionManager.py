@@ -11,55 +11,144 @@ It interacts with the DataManager and Transaction classes to implement distribut
 -------------------------------------------------------------------------------
 """
 
+import heapq
+from collections import deque
+
 from Transaction import Transaction
 from DataManager import DataManager
+from EventSink import TextSink
+from PlacementCatalog import PlacementCatalog
+from ReplicaSelector import ReplicaSelector
+from SiteTimeline import SiteTimeline
+from WaitQueue import WaitQueue
+from SiteWorker import RemoteSite, fan_out
 
 
 class TransactionManager:
-    def __init__(self):
-        self.sites = {i: DataManager(i) for i in range(1, 11)}      # 10 sites, indexed 1 to 10
+    SITE_MODES = ("local", "process")
+    EAGER_VALIDATION_MODES = ("flag",)
+
+    def __init__(self, gc_enabled=False, catalog=None, sink=None, site_mode="local", wal_options=None,
+                 replica_selection="ordered", history_retention=0, anti_entropy_batch=0, eager_validation=None,
+                 read_cache_size=256, read_own_writes=False):
+        self.sink = sink if sink is not None else TextSink()            # Receives every event the system reports
+        self.catalog = catalog if catalog is not None else PlacementCatalog()  # Sites, variables and replica placement
+        site_ids = self.catalog.site_ids
+        if site_mode not in self.SITE_MODES:
+            raise Exception(f"Unknown site mode {site_mode}; expected one of {', '.join(self.SITE_MODES)}.")
+        if eager_validation is not None and eager_validation not in self.EAGER_VALIDATION_MODES:
+            raise Exception(f"Unsupported eager validation mode {eager_validation}; "
+                            f"expected one of {', '.join(self.EAGER_VALIDATION_MODES)}.")
+
+        # Sites, indexed 1 to num_sites; in "process" mode every site runs in a worker process of its own.
+        # With wal_options (WriteAheadLog arguments) every site logs its changes and restores them on start.
+        self.site_mode = site_mode
+        site_class = RemoteSite if site_mode == "process" else DataManager
+        self.sites = {i: site_class(i, self.catalog, wal_options) for i in site_ids}
+        if wal_options is not None:
+            self.sink.before_flush = self.sync_logs  # A commit is only reported once its log records are on disk
         self.transactions = {}                                      # Active transactions: transaction_id -> Transaction object
-        self.site_status = {i: "up" for i in range(1, 11)}          # Site status: "up"/"down"
-        self.failure_history = {i: [] for i in range(1, 11)}        # Failure history: site_id -> list of failure/recovery events
-        self.waiting_read_queue = []                                # Queue for waiting reads: list of (transaction_id, variable, site_id)
+        self.site_status = {i: site.status for i, site in self.sites.items()}  # Site status: "up"/"down"
+        self.site_timelines = {i: SiteTimeline() for i in site_ids} # Failure/recovery timeline of each site
+        self.last_failure_time = None                               # Time of the latest failure of any site
+        self.replica_selector = ReplicaSelector(site_ids, replica_selection)  # Order in which replicas are read
+        self.waiting_read_queue = WaitQueue()                       # Reads waiting for a down site, indexed by site and transaction
         self.serialization_graph = {}                               # Store the transaction serialization graph
+        self.graph_predecessors = {}                                # Reverse edges: to_tid -> set of from_tids
+        self.graph_acyclic = True                                   # False once a scan found a cycle, until one finds none
+        self.begin_order = {}                                       # transaction_id -> position of its first begin
+        self.variable_readers = {}                                  # Committed readers: variable -> {transaction_id: Transaction}
+        self.variable_writers = {}                                  # Committed writers: variable -> {transaction_id: Transaction}
+
+        # Low-watermark garbage collection of finished transactions
+        self.gc_enabled = gc_enabled
+        self.active_start_times = {}                                # Transactions not yet ended: transaction_id -> start_time
+        self.active_heap = []                                       # Min-heap of (start_time, transaction_id), lazily pruned
+        self.read_write_heap = []                                   # The same, for read-write transactions only
+        self.finished_queue = deque()                               # Ended transactions in end order: (end_time, Transaction)
+        self.gc_stats = {"runs": 0, "transactions_retired": 0, "graph_nodes_retired": 0, "graph_edges_retired": 0}
+
+        # Run counters
+        self.stats = {"commits": 0, "aborts": 0, "failures": 0, "recoveries": 0}
+        self.abort_reasons = {}                                     # Abort reason -> number of aborts
+
+        # Commit group: site writes of transactions ending together, applied when the group ends
+        self.pending_writes = None                                  # site_id -> list of writes, or None outside a group
+        self.pending_commit_times = {}                              # (site_id, variable) -> newest pending commit time
+
+        # Dump support: the variables of every site in catalog order, and what changed since the last delta dump
+        self.site_variables = {i: [] for i in site_ids}             # site_id -> variables it holds, in catalog order
+        for variable in self.catalog.variables:
+            for site_id in self.catalog.sites_for(variable):
+                self.site_variables[site_id].append(variable)
+        self.changed_values = {}                                    # site_id -> variables written since the last delta
+        self.changed_status = set()                                 # Sites failed or recovered since the last delta
+        self.history_retention = history_retention                  # Timestamps of versions kept for dump(@N)
+
+        # Anti-entropy: a recovered site copies the replicated variables it missed from its peers, a batch per tick
+        self.anti_entropy_batch = anti_entropy_batch                # Variables copied per site and tick (0: off)
+        self.catch_up_queues = {}                                   # site_id -> deque of variables still to copy
+        self.sync_times = {i: {} for i in site_ids}                 # site_id -> {variable: time its copy caught up}
+        self.anti_entropy_stats = {"batches": 0, "variables": 0, "versions_copied": 0}
+
+        # Eager validation: writes are checked against the commit rules when they happen and when a site fails
+        self.eager_validation = eager_validation                    # None (off) or one of EAGER_VALIDATION_MODES
+        self.doomed = {}                                            # transaction_id -> abort reason found early
+
+        # Read cache: a transaction's repeated snapshot reads of a variable are served from its own cache. An
+        # entry stays valid while no version of the variable is written and no site changes which replicas may
+        # serve a snapshot; the epochs below count those events.
+        self.read_cache_size = read_cache_size                      # Cached variables per transaction (0: off)
+        self.replica_epoch = 0                                      # Bumped on site status and catch-up changes
+        self.variable_epochs = {}                                   # variable -> number of writes applied to it
+        self.read_cache_stats = {"hits": 0, "misses": 0}
+
+        # Read-your-own-writes: a read of a variable the transaction wrote returns the pending value, not the snapshot
+        self.read_own_writes = read_own_writes
+
+        # A run restarted from write-ahead logs continues its logical clock after the last logged commit
+        self.restored_time = max((site.latest_commit_time(variable) for site in self.sites.values()
+                                  for variable in site.variables), default = 0)
 
         # Initialize data variables
         self.initialize_data()
+        self.changed_values.clear()
 
     def initialize_data(self):
         """
-        Initialize the 20 variables across the 10 sites based on their index.
+        Initialize every variable of the catalog on the sites holding its replicas.
+        Sites restored from a write-ahead log already hold their data and are left alone.
         """
-        for i in range(1, 21):  # Variables x1 to x20
-            initial_value = 10 * i
-            if i % 2 == 0:  # Even-indexed variables
-                for site_id in self.sites:
-                    self.sites[site_id].write(f"x{i}", initial_value, 0)
-            else:  # Odd-indexed variables
-                site_id = 1 + (i % 10)
-                self.sites[site_id].write(f"x{i}", initial_value, 0)
+        site_batches = {}  # site_id -> list of (variable, value, commit_time)
+        for variable in self.catalog.variables:
+            initial_value = self.catalog.initial_value(variable)
+            for site_id in self.catalog.sites_for(variable):
+                if not self.sites[site_id].variables:
+                    site_batches.setdefault(site_id, []).append((variable, initial_value, 0))
+
+        self.apply_site_writes(site_batches)
 
     def print_serialization_graph(self):
-        # Check if there's at least one edge in the graph
-        if not any(self.serialization_graph.get(tid) for tid in self.serialization_graph):
-            # No edges found, so do not print anything
-            return
-        print("\n--- Serialization Graph ---")
-        for from_tid, edges in self.serialization_graph.items():
-            for to_tid, edge_types in edges.items():
-                edge_types_str = ",".join(edge_types)
-                print(f"T{from_tid} -[{edge_types_str}]-> T{to_tid}")
-        print("----------------------------")
+        # The graph is only formatted if the sink renders it; sinks skip graphs without edges
+        if self.sink.wants("graph"):
+            self.sink.emit("graph", graph = self.serialization_graph)
 
     def start_transaction(self, transaction_id, timestamp, is_read_only=False):
         """
         Begin a new transaction.
         """
-        print(f"Starting {'read-only ' if is_read_only else ''}transaction T{transaction_id} at timestamp {timestamp}.")
+        self.sink.emit("begin", transaction_id = transaction_id, timestamp = timestamp, read_only = is_read_only)
+        self.doomed.pop(transaction_id, None)
+        if transaction_id in self.transactions:
+            self.unindex_transaction(self.transactions[transaction_id])  # The old object is replaced below
+        self.begin_order.setdefault(transaction_id, len(self.begin_order))
         self.transactions[transaction_id] = Transaction(transaction_id, timestamp, is_read_only)
+        self.active_start_times[transaction_id] = timestamp
+        heapq.heappush(self.active_heap, (timestamp, transaction_id))
+        if not is_read_only:
+            heapq.heappush(self.read_write_heap, (timestamp, transaction_id))
 
-    def read_intention(self, transaction_id, variable):
+    def read_intention(self, transaction_id, variable, timestamp=None):
         """
         Add a read intention to the transaction's instruction queue and attempt the read immediately.
         Calls the DataManager's read method to retrieve the value.
@@ -70,53 +159,85 @@ class TransactionManager:
 
         transaction = self.transactions[transaction_id]
 
-        # Add the variable to the transaction's read set
-        transaction.add_read(variable)
-
-        # Determine the sites where the variable is stored
-        sites_to_read = []
-        variable_index = int(variable[1:])  # Extract the numeric part of the variable name
-
-        if variable_index % 2 == 0:
-            # Even-indexed variables (replicated): available on all sites
-            sites_to_read = [site_id for site_id, site in self.sites.items()]
-        else:
-            # Odd-indexed variables (non-replicated): stored on a single site
-            site_id = 1 + (variable_index % 10)
-            sites_to_read = [site_id]
-
-        # Attempt to read from the available sites
+        # Add the variable to the transaction's read set; read-only transactions never take part in the graph
+        if not transaction.is_read_only:
+            transaction.add_read(variable)
+
+        # With read_own_writes, a transaction reads its own pending write instead of its snapshot
+        if self.read_own_writes and variable in transaction.write_set:
+            value = transaction.write_set[variable][0]
+            self.sink.emit("read_own_write", transaction_id = transaction_id, variable = variable, value = value)
+            return value
+
+        # A repeated read is served by the cache while the replicas it was read from are unchanged. Other
+        # selection policies may pick another replica each time, so they always go to the sites.
+        use_cache = self.read_cache_size > 0 and self.replica_selector.policy == "ordered"
+        if use_cache:
+            epoch = (self.replica_epoch, self.variable_epochs.get(variable, 0))
+            entry = transaction.cached_read(variable, epoch)
+            if entry is not None:
+                value, site_id, _ = entry
+                self.read_cache_stats["hits"] += 1
+                self.replica_selector.record_read(variable, site_id)
+                self.sink.emit("read", transaction_id = transaction_id, variable = variable, value = value,
+                               site_id = site_id)
+                return value
+            self.read_cache_stats["misses"] += 1
+
+        # Determine the sites where the variable is stored, in the order the selection policy tries them
+        sites_to_read = self.replica_selector.order(variable, self.catalog.sites_for(variable))
+
+        # Worker processes are asked for their version in parallel; the replicas are still tried in order below
+        prefetched = {}
+        if self.site_mode == "process":
+            up_sites = [site_id for site_id in sites_to_read if self.site_status[site_id] == "up"]
+            outcomes = fan_out([(self.sites[site_id], "read_version", (variable, transaction.start_time))
+                                for site_id in up_sites])
+            prefetched = dict(zip(up_sites, outcomes))
+
+        # Attempt to read from the available sites. A down site that was up from the snapshot's version to the
+        # transaction's start will serve that version once it recovers, so the read waits for the first such site
+        # if no site that is up can serve it.
+        wait_site_id = None
         for site_id in sites_to_read:
             if self.site_status[site_id] == "up":
                 try:
-                    last_commit_time = self.sites[site_id].get_last_commit(variable, transaction.start_time)
-
-                    if last_commit_time is not None:
-                        for failure_time, status in self.failure_history[site_id]:
-                            if last_commit_time < failure_time < transaction.start_time:
-                                raise Exception("Site not functional during required period.")
-
-                    value = self.sites[site_id].read(variable, transaction.start_time)
-                    print(f"Transaction T{transaction_id} read {variable}:{value} from Site {site_id}.")
+                    if site_id in prefetched:
+                        succeeded, result = prefetched[site_id]
+                        if not succeeded:
+                            raise result
+                        value, last_commit_time = result
+                    else:
+                        value, last_commit_time = self.sites[site_id].read_version(variable, transaction.start_time)
+
+                    if last_commit_time is not None and not self.replica_is_current(
+                            site_id, variable, last_commit_time, transaction.start_time):
+                        raise Exception("Site not functional during required period.")
+
+                    self.replica_selector.record_read(variable, site_id)
+                    self.sink.emit("read", transaction_id = transaction_id, variable = variable, value = value,
+                                   site_id = site_id)
+                    if use_cache:
+                        transaction.cache_read(variable, value, site_id, epoch, self.read_cache_size)
                     return value  # Return the first successful read
                 except Exception as e:
                     pass
-            else:
+            elif wait_site_id is None:
                 try:
                     last_commit_time = self.sites[site_id].get_last_commit(variable, transaction.start_time)
-                    if last_commit_time is not None:
-                        for failure_time, status in self.failure_history[site_id]:
-                            if last_commit_time < failure_time < transaction.start_time:
-                                raise Exception("Site not functional during required period.")
-
-                    self.waiting_read_queue.append([transaction_id, variable_index, site_id])
-                    return
+                    if self.replica_is_current(site_id, variable, last_commit_time, transaction.start_time):
+                        wait_site_id = site_id
                 except Exception as e:
                     pass
 
+        if wait_site_id is not None:
+            self.waiting_read_queue.add(transaction_id, variable, wait_site_id, timestamp)
+            self.sink.emit("wait_site", transaction_id = transaction_id, variable = variable)
+            return None
+
         # If no valid site can provide the value, abort the transaction
-        print(f"Transaction T{transaction_id} aborted: No valid site could provide the value for {variable}.")
-        transaction.status = "aborted"
+        self.sink.emit("abort_no_valid_site", transaction_id = transaction_id, variable = variable)
+        self.abort_transaction(transaction, "no_valid_site")
         return None
 
     def write_intention(self, transaction_id, variable, value, timestamp):
@@ -128,7 +249,11 @@ class TransactionManager:
             raise Exception(f"Transaction T{transaction_id} does not exist.")
 
         transaction = self.transactions[transaction_id]
+        if transaction.is_read_only:
+            raise Exception(f"Transaction T{transaction_id} is read-only and cannot write {variable}.")
         transaction.add_write(variable, value, timestamp)
+        if self.eager_validation is not None:
+            self.validate_early(transaction, (variable,))
 
     def commit(self, transaction_id, time):
         """
@@ -142,109 +267,282 @@ class TransactionManager:
 
         transaction = self.transactions[transaction_id]
 
+        # Retire what no active transaction can conflict with before this one leaves the active set
+        self.collect_garbage(time)
+        self.end_transaction(transaction, time)
+
+        self.doomed.pop(transaction_id, None)
+
+        # A read-only transaction read a consistent snapshot and wrote nothing, so there is nothing to validate
+        if transaction.is_read_only:
+            transaction.commit_time = time
+            self.record_commit(transaction)
+            self.sink.emit("commit", transaction_id = transaction_id)
+            return
+
         # Check for First Committer Wins violation and failure timestamp validation
-        for variable, (value, write_timestamp) in transaction.write_set.items():
-            for site_id, site in self.sites.items():
-                if self.site_status[site_id] == "up" and (variable in site.variables or variable.startswith("x")):
-                    # First Committer Wins Check
-                    if variable in site.version_history:
-                        last_commit_time = site.version_history[variable][-1][1]
-                        if last_commit_time > transaction.start_time:
-                            print(
-                                f"Transaction T{transaction_id} aborted: {variable} was committed at {last_commit_time}, "
-                                f"after transaction start time {transaction.start_time}.")
-                            transaction.status = "aborted"
-                            return
+        violation = self.find_violation(transaction, transaction.write_set)
+        if violation is not None:
+            reason, event, fields = violation
+            self.sink.emit(event, **fields)
+            self.abort_transaction(transaction, reason)
+            return
 
-                # Failure Timestamp Validation
-                for failure_timestamp, status in self.failure_history[site_id]:
-                    if status == "down" and write_timestamp < failure_timestamp:
-                        print(
-                            f"Transaction T{transaction_id} aborted: Write timestamp {write_timestamp} for {variable} "
-                            f"precedes failure timestamp {failure_timestamp} on Site {site_id}.")
-                        transaction.status = "aborted"
-                        return
+        site_batches = {}  # site_id -> list of (variable, value, commit_time) to apply there
 
         for variable, (value, write_timestamp) in transaction.write_set.items():
             # Distribute writes to the appropriate sites
             written_sites = set()
-            variable_index = int(variable[1:])  # Extract the numeric part of the variable name
-
-            if variable_index % 2 == 0:
-                # Even-indexed variables: Write to all sites that are up
-                for site_id, site in self.sites.items():
-                    if self.site_status[site_id] == "up" and variable in site.variables:
-                        # Retrieve the last recovery timestamp
-                        last_recovery_time = max(
-                            (timestamp for timestamp, status in self.failure_history[site_id] if status == "up"),
-                            default = None
-                        )
-
-                        # Check if the write timestamp is valid
-                        if last_recovery_time is not None and write_timestamp < last_recovery_time:
-                            continue
-
-                        # Perform the write and track the site
-                        site.write(variable, value, write_timestamp)
-                        written_sites.add(site_id)
-            else:
-                # Odd-indexed variables: Write to a single designated site
-                site_id = 1 + (variable_index % 10)
-                if self.site_status[site_id] == "up" and variable in self.sites[site_id].variables:
+
+            # Write to every replica of the variable on a site that is up
+            for site_id in self.catalog.sites_for(variable):
+                site = self.sites[site_id]
+                if self.site_status[site_id] == "up" and variable in site.variables:
                     # Retrieve the last recovery timestamp
-                    last_recovery_time = max(
-                        (timestamp for timestamp, status in self.failure_history[site_id] if status == "up"),
-                        default = None
-                    )
+                    last_recovery_time = self.site_timelines[site_id].last_recovery_time
 
                     # Check if the write timestamp is valid
                     if last_recovery_time is not None and write_timestamp < last_recovery_time:
+                        # The site misses this write, so a copy caught up from its peers is incomplete again
+                        if self.sync_times[site_id].pop(variable, None) is not None:
+                            self.catch_up_queues.setdefault(site_id, deque()).append(variable)
+                            self.replica_epoch += 1
                         continue
 
-                    # Perform the write and track the site
-                    self.sites[site_id].write(variable, value, write_timestamp)
+                    # Queue the write for the site and track the site
+                    site_batches.setdefault(site_id, []).append((variable, value, write_timestamp))
                     written_sites.add(site_id)
 
-            # Print the sites written to in a single line
+            # Report the sites written to in a single line
             if written_sites:
                 written_sites_list = sorted(written_sites)  # Sort for consistent output
-                print(f"Transaction T{transaction_id} wrote {variable} to sites: {', '.join(map(str, written_sites_list))}")
+                self.sink.emit("write", transaction_id = transaction_id, variable = variable, sites = written_sites_list)
+
+        # Every site applies its share of the writes, now or when the commit group ends
+        if self.pending_writes is None:
+            self.apply_site_writes(site_batches, self.version_watermark(time))
+        else:
+            for site_id, writes in site_batches.items():
+                self.pending_writes.setdefault(site_id, []).extend(writes)
+                for variable, _, write_timestamp in writes:
+                    key = (site_id, variable)
+                    self.pending_commit_times[key] = max(write_timestamp, self.pending_commit_times.get(key, 0))
 
         transaction.commit_time = time
         # print(f"T{transaction.transaction_id} commit time = {transaction.commit_time}\n" )
 
-        # Construct edges in the serialization graph
-        for other_tid, other_txn in self.transactions.items():
-            if other_tid == transaction_id or other_txn.status != "committed":
-                continue
-
+        # Construct edges in the serialization graph, visiting only committed transactions that share a variable
+        rw_targets = {}
+        for variable in transaction.read_set:
+            rw_targets.update(self.variable_writers.get(variable, {}))
+        wr_sources = {}
+        ww_sources = {}
+        for variable in transaction.write_set:
+            wr_sources.update(self.variable_readers.get(variable, {}))
+            ww_sources.update(self.variable_writers.get(variable, {}))
+
+        conflicting_tids = (rw_targets.keys() | wr_sources.keys() | ww_sources.keys()) - {transaction_id}
+        for other_tid in sorted(conflicting_tids, key = self.begin_order.__getitem__):
             # RW Edge: T(transaction_id) read something that other_tid wrote
-            if any(var in other_txn.write_set for var in self.transactions[transaction_id].read_set):
-                self.add_dependency(transaction, other_txn, "rw")
+            if other_tid in rw_targets:
+                self.add_dependency(transaction, rw_targets[other_tid], "rw")
 
             # WR Edge: T(transaction_id) wrote something that other_tid read
-            if any(var in self.transactions[transaction_id].write_set for var in other_txn.read_set):
-                self.add_dependency(other_txn, transaction, "wr")
+            if other_tid in wr_sources:
+                self.add_dependency(wr_sources[other_tid], transaction, "wr")
 
             # WW Edge: both wrote to the same variable
-            if any(var in self.transactions[transaction_id].write_set for var in other_txn.write_set):
-                self.add_dependency(other_txn, transaction, "ww")
+            if other_tid in ww_sources:
+                self.add_dependency(ww_sources[other_tid], transaction, "ww")
 
         # Print serialization graph for debugging
         self.print_serialization_graph()
 
         # Check for cycles in the serialization graph
-        cycle = self.has_cycle()
+        cycle = self.find_cycle(transaction_id)
         if cycle and self.has_consecutive_rw_edges(cycle):
             last_tid = self.get_last_transaction_in_cycle(cycle)
-            print(f"Cycle with consecutive RW edges detected! Transaction T{last_tid} aborted.")
-            self.transactions[last_tid].status = "aborted"
+            self.sink.emit("abort_cycle", transaction_id = last_tid)
+            self.abort_transaction(self.transactions[last_tid], "rw_cycle")
             self.remove_transaction_from_graph(last_tid)
             return
 
         # Mark the transaction as committed
+        self.record_commit(transaction)
+        self.index_transaction(transaction)
+        self.sink.emit("commit", transaction_id = transaction_id)
+
+    def find_violation(self, transaction, variables):
+        """
+        Check the given variables of a transaction's write set against the commit rules:
+        1. First Committer Wins: no replica that is up holds a version committed after the transaction started.
+        2. No site, whether or not it stores the variable, failed after the transaction wrote the variable.
+        The sites are checked in order, both rules per site. Returns the first violation as
+        (abort reason, event, event fields), or None.
+        """
+        transaction_id = transaction.transaction_id
+        for variable in variables:
+            write_timestamp = transaction.write_set[variable][1]
+            replicas = self.catalog.sites_for(variable)
+
+            # Without a failure after the write only the replicas can violate a rule
+            if self.last_failure_time is None or self.last_failure_time <= write_timestamp:
+                sites_to_check = replicas
+            else:
+                sites_to_check = self.sites
+            for site_id in sites_to_check:
+                site = self.sites[site_id]
+                if self.site_status[site_id] == "up" and site_id in replicas:
+                    # First Committer Wins Check, counting writes of the commit group not yet applied
+                    last_commit_time = site.latest_commit_time(variable)
+                    pending_commit_time = self.pending_commit_times.get((site_id, variable))
+                    if pending_commit_time is not None and (last_commit_time is None
+                                                            or pending_commit_time > last_commit_time):
+                        last_commit_time = pending_commit_time
+                    if last_commit_time is not None and last_commit_time > transaction.start_time:
+                        return "first_committer_wins", "abort_first_committer_wins", {
+                            "transaction_id": transaction_id, "variable": variable,
+                            "commit_time": last_commit_time, "start_time": transaction.start_time,
+                        }
+
+                # Failure Timestamp Validation
+                failure_timestamp = self.site_timelines[site_id].first_failure_after(write_timestamp)
+                if failure_timestamp is not None:
+                    return "failure_timestamp", "abort_failure_timestamp", {
+                        "transaction_id": transaction_id, "variable": variable, "write_timestamp": write_timestamp,
+                        "failure_timestamp": failure_timestamp, "site_id": site_id,
+                    }
+        return None
+
+    def validate_early(self, transaction, variables):
+        """
+        Eager validation: check some of a transaction's writes against the commit rules now, instead of only at
+        commit, and report a transaction that would abort. The commit still decides: a flagged transaction that
+        rewrites a variable after a failure can pass again, so its whole write set is checked once more on every
+        write and the flag is lifted when nothing is violated any more.
+        Aborting at once is not offered: which commit will abort cannot be known before the transaction's last
+        write.
+        """
+        transaction_id = transaction.transaction_id
+        if transaction.status != "active":
+            return
+        if transaction_id in self.doomed:
+            violation = self.find_violation(transaction, transaction.write_set)
+            if violation is None:
+                del self.doomed[transaction_id]
+                self.sink.emit("doom_lifted", transaction_id = transaction_id)
+            return
+
+        violation = self.find_violation(transaction, variables)
+        if violation is not None:
+            self.doomed[transaction_id] = violation[0]
+            self.sink.emit("doomed", transaction_id = transaction_id, reason = violation[0])
+
+    def validate_after_failure(self, site_id, timestamp):
+        """
+        Eager validation after a site failure at the given timestamp: every active transaction that has written
+        something would abort at commit unless it rewrites its variables, as the failure follows its writes.
+        """
+        for transaction in list(self.transactions.values()):
+            if transaction.write_set and transaction.transaction_id not in self.doomed:
+                self.validate_early(transaction, transaction.write_set)
+
+    def apply_site_writes(self, site_batches, gc_watermark=None):
+        """
+        Send every site its list of (variable, value, commit_time) writes in one call.
+        Worker processes apply theirs in parallel.
+        """
+        for succeeded, result in fan_out([(self.sites[site_id], "write_batch", (writes, gc_watermark))
+                                          for site_id, writes in site_batches.items()]):
+            if not succeeded:
+                raise result
+        variable_epochs = self.variable_epochs
+        for site_id, writes in site_batches.items():
+            self.changed_values.setdefault(site_id, set()).update(variable for variable, _, _ in writes)
+            for variable, _, _ in writes:
+                variable_epochs[variable] = variable_epochs.get(variable, 0) + 1
+
+    def begin_commit_group(self):
+        """
+        Start a commit group. Commits are validated and reported one by one, in order, exactly as without a
+        group, but their site writes are held back and applied together by end_commit_group().
+        Only commits may run while a group is open.
+        """
+        self.pending_writes = {}
+
+    def end_commit_group(self, time):
+        """
+        Apply the writes of the open commit group, one batch per site. time is the timestamp of the group's last
+        commit; every transaction of the group has left the active set by then.
+        """
+        site_batches, self.pending_writes = self.pending_writes, None
+        self.pending_commit_times.clear()
+        if site_batches:
+            self.apply_site_writes(site_batches, self.version_watermark(time))
+
+    def version_watermark(self, time):
+        """
+        Return the time below which versions written at the given time may be dropped: versions that no active or
+        future snapshot can see, unless they are recent enough to be kept for dumps of the past.
+        """
+        return min(self.low_watermark(time), time - self.history_retention)
+
+    def abort_transaction(self, transaction, reason):
+        """
+        Mark a transaction as aborted, drop it from the reader/writer index, cancel its waiting reads and drop its
+        read cache.
+        The reason (e.g., "first_committer_wins") is counted in abort_reasons. stats and abort_reasons count every
+        transaction once, by its final outcome: a committed transaction aborted by a later commit's cycle check
+        stops counting as a commit.
+        """
+        if transaction.status != "aborted":
+            if transaction.status == "committed":
+                self.stats["commits"] -= 1
+            self.stats["aborts"] += 1
+            self.abort_reasons[reason] = self.abort_reasons.get(reason, 0) + 1
+            transaction.abort_reason = reason
+        transaction.status = "aborted"
+        self.unindex_transaction(transaction)
+        self.waiting_read_queue.cancel(transaction.transaction_id)
+        transaction.read_cache.clear()
+
+    def record_commit(self, transaction):
+        """
+        Mark a transaction as committed and count it. A transaction aborted because a read found no valid site still
+        commits at its end, as it always has; its abort then stops counting, so it is counted once, as a commit.
+        """
+        if transaction.status == "aborted":
+            self.stats["aborts"] -= 1
+            self.abort_reasons[transaction.abort_reason] -= 1
+            if not self.abort_reasons[transaction.abort_reason]:
+                del self.abort_reasons[transaction.abort_reason]
+            transaction.abort_reason = None
         transaction.status = "committed"
-        print(f"Transaction T{transaction_id} has been committed.")
+        self.stats["commits"] += 1
+
+    def index_transaction(self, transaction):
+        """
+        Record a committed transaction as a reader/writer of every variable it touched.
+        """
+        tid = transaction.transaction_id
+        for variable in transaction.read_set:
+            self.variable_readers.setdefault(variable, {})[tid] = transaction
+        for variable in transaction.write_set:
+            self.variable_writers.setdefault(variable, {})[tid] = transaction
+
+    def unindex_transaction(self, transaction):
+        """
+        Remove a transaction from the reader/writer index, if it is indexed.
+        """
+        tid = transaction.transaction_id
+        for index, variables in ((self.variable_readers, transaction.read_set),
+                                 (self.variable_writers, transaction.write_set)):
+            for variable in variables:
+                entries = index.get(variable)
+                if entries is not None and entries.get(tid) is transaction:
+                    del entries[tid]
+                    if not entries:
+                        del index[variable]
 
     def update_site_status(self, site_id, status, timestamp):
         """
@@ -257,57 +555,285 @@ class TransactionManager:
         if status == "down":
             if self.site_status[site_id] != "down":
                 self.sites[site_id].fail()
-                self.failure_history[site_id].append((timestamp, "down"))
+                self.site_timelines[site_id].record(timestamp, "down")
+                self.last_failure_time = timestamp
+                self.catch_up_queues.pop(site_id, None)
+                self.sync_times[site_id].clear()
+                self.replica_epoch += 1
+                self.stats["failures"] += 1
                 self.site_status[site_id] = status
+                self.changed_status.add(site_id)
+                self.sink.emit("fail", site_id = site_id, timestamp = timestamp)
+                if self.eager_validation is not None:
+                    self.validate_after_failure(site_id, timestamp)
         elif status == "up":
             if self.site_status[site_id] != "up":
                 # Recover the site
                 self.sites[site_id].recover()
-                self.failure_history[site_id].append((timestamp, "up"))
+                self.site_timelines[site_id].record(timestamp, "up")
+                self.replica_epoch += 1
+                self.stats["recoveries"] += 1
                 self.site_status[site_id] = status
-                print(f"Site {site_id} has been recovered.")
-
-                # Process the waiting read queue
-                for entry in list(self.waiting_read_queue):  # Use a copy to allow modification during iteration
-                    transaction_id, variable_index, waiting_site_id = entry
-                    if waiting_site_id == site_id:  # Check if the recovered site matches the waiting read site
-                        variable = f"x{variable_index}"  # Convert the variable index back to its name
-                        try:
-                            value = self.sites[site_id].read(variable, self.transactions[transaction_id].start_time)
-                            print(f"Transaction T{transaction_id} read {variable}:{value} from recovered Site {site_id}.")
-                            # Remove the entry from the queue since it has been processed
-                            self.waiting_read_queue.remove(entry)
-                        except Exception as e:
-                            print(f"Transaction T{transaction_id} failed to read {variable} from recovered Site {site_id}: {e}")
+                self.changed_status.add(site_id)
+                self.sink.emit("recover", site_id = site_id, timestamp = timestamp)
+
+                # Replicated variables are copied from the peers in the background, if anti-entropy is on
+                if self.anti_entropy_batch:
+                    self.catch_up_queues[site_id] = deque(variable for variable in self.site_variables[site_id]
+                                                          if self.catalog.is_replicated(variable))
+
+                # Wake the reads waiting on this site as one batch, in FIFO order
+                self.wake_waiting_reads(site_id, timestamp)
 
         self.site_status[site_id] = status
 
+    def wake_waiting_reads(self, site_id, timestamp, variable=None):
+        """
+        Serve the reads waiting on a recovered site (optionally only those of one variable) in FIFO order.
+        Reads that still cannot be served stay queued.
+        """
+        site = self.sites[site_id]
+        for waiter in self.waiting_read_queue.waiters(site_id, variable):
+            transaction_id = waiter.transaction_id
+            try:
+                value = site.read(waiter.variable, self.transactions[transaction_id].start_time)
+                self.replica_selector.record_read(waiter.variable, site_id)
+                self.sink.emit("read_recovered", transaction_id = transaction_id, variable = waiter.variable,
+                               value = value, site_id = site_id)
+                self.waiting_read_queue.complete(waiter, timestamp)
+            except Exception as e:
+                self.sink.emit("read_recovered_failed", transaction_id = transaction_id, variable = waiter.variable,
+                               site_id = site_id, error = e)
+
+    def replica_is_current(self, site_id, variable, commit_time, start_time):
+        """
+        Return True if the version a site holds for a snapshot, committed at commit_time, is the one the snapshot
+        must see: the site was up from that commit to the snapshot, or from when anti-entropy caught its copy of
+        the variable up to the snapshot.
+        """
+        timeline = self.site_timelines[site_id]
+        if not timeline.was_down_between(commit_time, start_time):
+            return True
+        sync_time = self.sync_times[site_id].get(variable)
+        return (sync_time is not None and sync_time <= start_time
+                and not timeline.was_down_between(sync_time, start_time))
+
+    def current_replica(self, variable, time, excluded_site_id):
+        """
+        Return the first other site that is up and holds the latest committed version of a variable at a time, or
+        None if there is none.
+        """
+        for site_id in self.catalog.sites_for(variable):
+            if site_id != excluded_site_id and self.site_status[site_id] == "up":
+                commit_time = self.sites[site_id].latest_commit_time(variable)
+                if commit_time is not None and self.replica_is_current(site_id, variable, commit_time, time):
+                    return site_id
+        return None
+
+    def tick(self, timestamp):
+        """
+        Run the background work due before the command at a timestamp: one anti-entropy batch per recovered site.
+        Nothing runs while a commit group is open, since its writes have not reached the peers yet.
+        """
+        if self.catch_up_queues and self.pending_writes is None:
+            self.run_anti_entropy(timestamp)
+
+    def run_anti_entropy(self, timestamp):
+        """
+        Copy the next batch of replicated variables every recovered site missed from up-to-date peers: the versions a
+        site lacks are fetched from the peers and applied with one batch per site. The copies are complete as of
+        timestamp, so from then on they serve snapshots (see replica_is_current) and the reads waiting on them are
+        retried. Variables no peer can provide yet go back to the end of the queue.
+        """
+        sources = {}  # site_id -> {variable: site_id of the peer it is copied from}
+        for site_id, queue in list(self.catch_up_queues.items()):
+            batch = {}
+            retries = []
+            while queue and len(batch) + len(retries) < self.anti_entropy_batch:
+                variable = queue.popleft()
+                commit_time = self.sites[site_id].latest_commit_time(variable)
+                if self.replica_is_current(site_id, variable, commit_time, timestamp):
+                    continue  # A commit since the recovery already brought the copy up to date
+                source_id = self.current_replica(variable, timestamp, site_id)
+                if source_id is None:
+                    retries.append(variable)
+                else:
+                    batch[variable] = source_id
+            queue.extend(retries)
+            if not queue:
+                del self.catch_up_queues[site_id]
+            if batch:
+                sources[site_id] = batch
+        if not sources:
+            return
+
+        # Fetch the chains of every site taking part, one call per site
+        wanted = {}  # site_id -> variables whose chains are needed
+        for site_id, batch in sources.items():
+            wanted.setdefault(site_id, set()).update(batch)
+            for variable, source_id in batch.items():
+                wanted.setdefault(source_id, set()).add(variable)
+        calls = [(self.sites[site_id], "version_chains", (sorted(variables),)) for site_id, variables in wanted.items()]
+        chains = {}
+        for site_id, (succeeded, result) in zip(wanted, fan_out(calls)):
+            if not succeeded:
+                raise result
+            chains[site_id] = result
+
+        site_batches = {}  # site_id -> list of (variable, value, commit_time) it is missing
+        for site_id, batch in sources.items():
+            for variable, source_id in batch.items():
+                held_times = {commit_time for _, commit_time in chains[site_id].get(variable, ())}
+                for value, commit_time in chains[source_id][variable]:
+                    if commit_time not in held_times:
+                        site_batches.setdefault(site_id, []).append((variable, value, commit_time))
+        if site_batches:
+            self.apply_site_writes(site_batches, self.version_watermark(timestamp))
+
+        for site_id, batch in sources.items():
+            variables = list(batch)
+            for variable in variables:
+                self.sync_times[site_id][variable] = timestamp
+            self.replica_epoch += 1
+            self.anti_entropy_stats["batches"] += 1
+            self.anti_entropy_stats["variables"] += len(variables)
+            self.anti_entropy_stats["versions_copied"] += len(site_batches.get(site_id, ()))
+            self.sink.emit("catch_up", site_id = site_id, variables = variables, timestamp = timestamp)
+            for variable in variables:
+                self.wake_waiting_reads(site_id, timestamp, variable)
+
+    def sync_logs(self):
+        """
+        Force the commits the sites' write-ahead logs still buffer to disk, all sites in parallel.
+        """
+        for succeeded, result in fan_out([(site, "sync_log", ()) for site in self.sites.values()]):
+            if not succeeded:
+                raise result
+
+    def close(self):
+        """
+        Force the sites' write-ahead logs to disk and stop the site worker processes, if any.
+        """
+        for site in self.sites.values():
+            site.close()
+
+    def end_transaction(self, transaction, time):
+        """
+        Remove a transaction from the active set and, with garbage collection on, queue it to be retired.
+        Reads it is still waiting on are cancelled and its read cache is dropped.
+        """
+        self.waiting_read_queue.cancel(transaction.transaction_id)
+        transaction.read_cache.clear()
+        if self.active_start_times.get(transaction.transaction_id) == transaction.start_time:
+            del self.active_start_times[transaction.transaction_id]
+        if self.gc_enabled:
+            self.finished_queue.append((time, transaction))
+
+    def low_watermark(self, time, include_read_only=True):
+        """
+        Return the start time of the oldest active transaction, or the given time if none is active.
+        Read-only transactions hold back the versions their snapshots need, but not the graph, so they can be
+        left out.
+        """
+        heap = self.active_heap if include_read_only else self.read_write_heap
+        while heap:
+            start_time, transaction_id = heap[0]
+            if self.active_start_times.get(transaction_id) == start_time:
+                return start_time
+            heapq.heappop(heap)  # Stale entry of an ended (or restarted) transaction
+        return time
+
+    def collect_garbage(self, time):
+        """
+        Retire ended transactions that finished before the oldest active read-write transaction started: their
+        Transaction objects, their serialization graph nodes with all their edges, and their reader/writer index
+        entries. Such transactions are not concurrent with any active or future transaction, so later commits add
+        no edges to them. This keeps the graph and the work of every commit bounded by the transactions that
+        overlap, but conflicts with retired transactions no longer count: a commit that would only close a cycle
+        through them commits.
+        """
+        if not self.gc_enabled:
+            return
+
+        # Active read-only transactions have no graph node and cannot conflict, so they do not hold anything back
+        watermark = self.low_watermark(time, include_read_only = False)
+        self.gc_stats["runs"] += 1
+
+        while self.finished_queue and self.finished_queue[0][0] < watermark:
+            _, transaction = self.finished_queue.popleft()
+            tid = transaction.transaction_id
+
+            if self.transactions.get(tid) is not transaction:
+                continue  # The id was reused by a newer transaction
+
+            if tid in self.serialization_graph or tid in self.graph_predecessors:
+                self.gc_stats["graph_edges_retired"] += (
+                    len(self.serialization_graph.get(tid, {})) + len(self.graph_predecessors.get(tid, ()))
+                )
+                self.remove_transaction_from_graph(tid)
+                self.gc_stats["graph_nodes_retired"] += 1
+
+            self.unindex_transaction(transaction)
+            del self.transactions[tid]  # begin_order keeps its position, for when the id begins again
+            self.gc_stats["transactions_retired"] += 1
+
     def get_failure_history(self, site_id):
         """
         Retrieve the failure history of a specific site.
         """
-        if site_id not in self.failure_history:
+        if site_id not in self.site_timelines:
             raise Exception(f"Site {site_id} does not exist.")
-        return self.failure_history[site_id]
+        return self.site_timelines[site_id].events
 
-    def querystate(self):
+    def querystate(self, site_ids=None, variables=None, as_of=None, delta=False):
         """
-        Print the current state of the system for debugging.
+        Report the state of the system for debugging.
+        By default every variable of every site is reported with its current value. The report can be limited to
+        some sites and/or variables, show the values as of an earlier timestamp (versions dropped by a failure or
+        by garbage collection are left out), or, with delta, show only the values written and the sites failed or
+        recovered since the previous delta dump.
         """
-        print("\n--- Dump State ---")
-        for site_id, dm in self.sites.items():
-            # Sort variables by the numeric part of their names
-            sorted_variables = sorted(dm.variables.items(), key=lambda item: int(item[0][1:]))
+        if delta and as_of is not None:
+            raise Exception("A delta dump cannot be taken as of an earlier timestamp.")
+        if delta:
+            changed_values, self.changed_values = self.changed_values, {}
+            changed_status, self.changed_status = self.changed_status, set()
+        if not self.sink.wants("dump"):
+            return
 
-            # Format variable-value pairs as a string
-            site_data = ", ".join(f"{var}: {val}" for var, val in sorted_variables)
+        for site_id in site_ids or ():
+            if site_id not in self.sites:
+                raise Exception(f"Site {site_id} does not exist.")
+
+        variable_index = self.catalog.variable_index
+        if variables is not None:
+            variables = sorted(set(variables), key = lambda variable: variable_index.get(variable, 0))
+        if delta:
+            site_ids = sorted(set(site_ids or self.sites) & (set(changed_values) | changed_status))
+        elif not site_ids:
+            site_ids = self.sites
+
+        sites = []
+        for site_id in site_ids:
+            dm = self.sites[site_id]
+            if delta:
+                names = sorted(changed_values.get(site_id, ()), key = variable_index.__getitem__)
+                if variables is not None:
+                    names = [variable for variable in names if variable in variables]
+            elif variables is not None:
+                names = [variable for variable in variables if site_id in self.catalog.sites_for(variable)]
+                if not names:
+                    continue
+            else:
+                names = self.site_variables[site_id]  # Already in catalog order
 
-            # Check the site status and include it in the output
-            if self.site_status[site_id] == "down":
-                print(f"site {site_id} (down) – {site_data}")
+            if as_of is None:
+                values = [(variable, dm.variables[variable]) for variable in names]
             else:
-                print(f"site {site_id} – {site_data}")
-        print("--------------------")
+                values = [(variable, value) for variable, value in zip(names, dm.values_as_of(names, as_of))
+                          if value is not None]
+            sites.append((site_id, self.site_status[site_id], values))
+        self.sink.emit("dump", sites = sites, as_of = as_of, delta = delta)
 
     def add_dependency(self, from_txn, to_txn, edge_type):
         """
@@ -317,6 +843,7 @@ class TransactionManager:
             self.serialization_graph[from_txn.transaction_id] = {}
         if to_txn.transaction_id not in self.serialization_graph[from_txn.transaction_id]:
             self.serialization_graph[from_txn.transaction_id][to_txn.transaction_id] = set()
+            self.graph_predecessors.setdefault(to_txn.transaction_id, set()).add(from_txn.transaction_id)
 
         if from_txn.commit_time > to_txn.commit_time:
             self.serialization_graph[from_txn.transaction_id][to_txn.transaction_id].add(edge_type)
@@ -326,46 +853,79 @@ class TransactionManager:
     def remove_transaction_from_graph(self, tid):
         """
         Remove a transaction from the graph.
+        Only the neighbours of tid are touched, using the reverse edges kept in graph_predecessors.
         """
         if tid in self.serialization_graph:
+            for to_tid in self.serialization_graph[tid]:
+                self.graph_predecessors[to_tid].discard(tid)
             del self.serialization_graph[tid]
-        for from_tid in list(self.serialization_graph.keys()):
-            if tid in self.serialization_graph[from_tid]:
-                del self.serialization_graph[from_tid][tid]
+        for from_tid in self.graph_predecessors.pop(tid, ()):
+            del self.serialization_graph[from_tid][tid]
 
     def has_cycle(self):
         """
-        Detect a cycle in the serialization graph using DFS and return the cycle if found.
+        Detect a cycle anywhere in the serialization graph using DFS and return the cycle if found.
+        Commit goes through find_cycle, which skips this scan while no cycle can have formed. The DFS keeps its own
+        stack of edge iterators, so long paths do not hit the recursion limit.
         """
+        graph = self.serialization_graph
         visited = set()
-        stack = []
-        parent_map = {}  # To track the path and reconstruct the cycle
-
-        def dfs(node):
-            if node in stack:  # Cycle detected
-                cycle_start_index = stack.index(node)
-                return stack[cycle_start_index:]  # Return the cycle as a list of nodes
-            if node in visited:
-                return None
-
-            visited.add(node)
-            stack.append(node)
-            for neighbor in self.serialization_graph.get(node, {}):
-                parent_map[neighbor] = node
-                result = dfs(neighbor)
-                if result:
-                    return result
-            stack.pop()
-            return None
 
-        for node in self.serialization_graph:
-            stack.clear()
-            result = dfs(node)
-            if result:  # A cycle is detected
-                return result
+        for root in graph:
+            if root in visited:
+                continue
+            visited.add(root)
+            stack = [root]
+            on_stack = {root: 0}  # Node -> position in the stack, for constant-time membership checks
+            edges = [iter(graph[root])]
+            while edges:
+                for neighbor in edges[-1]:
+                    if neighbor in on_stack:  # Cycle detected
+                        return stack[on_stack[neighbor]:]  # Return the cycle as a list of nodes
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        on_stack[neighbor] = len(stack)
+                        stack.append(neighbor)
+                        edges.append(iter(graph.get(neighbor, {})))
+                        break
+                else:
+                    # Every edge of the node on top of the stack has been explored
+                    edges.pop()
+                    del on_stack[stack.pop()]
 
         return None
 
+    def find_cycle(self, tid):
+        """
+        Return the cycle has_cycle() finds in the serialization graph after tid's commit added its edges, or None.
+        While the graph is acyclic, a commit only adds edges that touch the committing transaction, so any new cycle
+        passes through it: if tid cannot reach itself the graph is still acyclic and the full scan is skipped.
+        Otherwise the full scan runs, so the cycle reported (and the abort decided from it) is the one it finds.
+        """
+        if self.graph_acyclic and not self.reaches_itself(tid):
+            return None
+        cycle = self.has_cycle()
+        self.graph_acyclic = cycle is None
+        return cycle
+
+    def reaches_itself(self, tid):
+        """
+        Return True if a path of the serialization graph leads from tid back to tid.
+        """
+        graph = self.serialization_graph
+        if tid not in self.graph_predecessors:
+            return False
+        reached = set()
+        pending = list(graph.get(tid, ()))
+        while pending:
+            node = pending.pop()
+            if node == tid:
+                return True
+            if node not in reached:
+                reached.add(node)
+                pending.extend(graph.get(node, ()))
+        return False
+
     def has_consecutive_rw_edges(self, cycle):
         """
         Check if the given cycle contains two consecutive RW edges.
@@ -0,0 +1,119 @@
+"""
+-------------------------------------------------------------------------------
+Author(s): Rahi Krishna (rk4748), Tanmay G. Dadhania (tgd8275)
+Date: October 16, 2026
+
+Description:
+This file defines the WaitQueue class, which holds reads blocked on a down site until the site recovers.
+Waiters are indexed by site, by (site, variable) and by transaction, so a recovery only visits the waiters of the
+recovered site (in FIFO order) and a finished transaction can cancel its waiters without scanning the whole queue.
+It also keeps queue depth and wait-time metrics.
+-------------------------------------------------------------------------------
+"""
+
+
+class WaitingRead:
+    __slots__ = ("sequence", "transaction_id", "variable", "site_id", "enqueued_at")
+
+    def __init__(self, sequence, transaction_id, variable, site_id, enqueued_at):
+        self.sequence = sequence            # Arrival order, used to keep each site's waiters FIFO
+        self.transaction_id = transaction_id
+        self.variable = variable
+        self.site_id = site_id
+        self.enqueued_at = enqueued_at      # Logical time the read started waiting (None if unknown)
+
+
+class WaitQueue:
+    def __init__(self):
+        self.by_site = {}           # site_id -> {sequence: WaitingRead}, in arrival order
+        self.by_variable = {}       # (site_id, variable) -> {sequence: WaitingRead}, in arrival order
+        self.by_transaction = {}    # transaction_id -> {sequence: WaitingRead}
+        self.next_sequence = 0
+        self.depth = 0              # Number of reads currently waiting
+
+        # Metrics
+        self.peak_depth = 0
+        self.enqueued = 0
+        self.woken = 0
+        self.cancelled = 0
+        self.total_wait_time = 0
+        self.max_wait_time = 0
+
+    def __len__(self):
+        return self.depth
+
+    def add(self, transaction_id, variable, site_id, timestamp=None):
+        """
+        Queue a read of variable by a transaction until site_id recovers.
+        """
+        waiter = WaitingRead(self.next_sequence, transaction_id, variable, site_id, timestamp)
+        self.next_sequence += 1
+
+        self.by_site.setdefault(site_id, {})[waiter.sequence] = waiter
+        self.by_variable.setdefault((site_id, variable), {})[waiter.sequence] = waiter
+        self.by_transaction.setdefault(transaction_id, {})[waiter.sequence] = waiter
+
+        self.depth += 1
+        self.enqueued += 1
+        self.peak_depth = max(self.peak_depth, self.depth)
+        return waiter
+
+    def waiters(self, site_id, variable=None):
+        """
+        Return the batch of reads waiting on a site (optionally only for one variable), in FIFO order.
+        The waiters stay queued until they are completed or cancelled.
+        """
+        if variable is None:
+            return list(self.by_site.get(site_id, {}).values())
+        return list(self.by_variable.get((site_id, variable), {}).values())
+
+    def complete(self, waiter, timestamp=None):
+        """
+        Remove a waiter whose read has been served and record how long it waited.
+        """
+        if self.discard(waiter):
+            self.woken += 1
+            if timestamp is not None and waiter.enqueued_at is not None:
+                wait_time = timestamp - waiter.enqueued_at
+                self.total_wait_time += wait_time
+                self.max_wait_time = max(self.max_wait_time, wait_time)
+
+    def cancel(self, transaction_id):
+        """
+        Remove every read a transaction is waiting on, e.g., because it committed or aborted.
+        """
+        for waiter in list(self.by_transaction.get(transaction_id, {}).values()):
+            if self.discard(waiter):
+                self.cancelled += 1
+
+    def discard(self, waiter):
+        """
+        Remove a waiter from all indexes. Returns False if it was no longer queued.
+        """
+        site_waiters = self.by_site.get(waiter.site_id)
+        if site_waiters is None or site_waiters.pop(waiter.sequence, None) is None:
+            return False
+
+        self.depth -= 1
+        for index, key in ((self.by_site, waiter.site_id),
+                           (self.by_variable, (waiter.site_id, waiter.variable)),
+                           (self.by_transaction, waiter.transaction_id)):
+            entries = index[key]
+            entries.pop(waiter.sequence, None)
+            if not entries:
+                del index[key]
+        return True
+
+    def stats(self):
+        """
+        Return queue depth and wait-time metrics.
+        """
+        return {
+            "depth": self.depth,
+            "peak_depth": self.peak_depth,
+            "enqueued": self.enqueued,
+            "woken": self.woken,
+            "cancelled": self.cancelled,
+            "mean_wait_time": self.total_wait_time / self.woken if self.woken else 0,
+            "max_wait_time": self.max_wait_time,
+        }
@@ -0,0 +1,116 @@
+"""
+-------------------------------------------------------------------------------
+Author(s): Rahi Krishna (rk4748), Tanmay G. Dadhania (tgd8275)
+Date: October 16, 2026
+
+Description:
+This file generates synthetic traces in the same begin/R/W/end/fail/recover/dump syntax as the files in tests/
+(read-only transactions start with beginRO).
+The workload is tunable: number of transactions, how many run concurrently, transaction length, read/write ratio,
+Zipfian skew of the accessed variables, share of read-only transactions, and site failure/recovery rates.
+Generation is seeded, so the same parameters always produce the same trace.
+-------------------------------------------------------------------------------
+"""
+
+import sys
+import random
+import argparse
+from itertools import accumulate
+
+
+class WorkloadGenerator:
+    def __init__(self, transactions=1000, concurrency=10, transaction_length=5, read_ratio=0.7, zipf_skew=0.0,
+                 num_variables=20, num_sites=10, read_only_share=0.0, failure_rate=0.0, recovery_rate=0.2,
+                 dump=True, seed=0):
+        self.transactions = transactions            # Number of transactions to begin
+        self.concurrency = concurrency              # Maximum number of transactions running at once
+        self.transaction_length = transaction_length  # Mean number of reads/writes per transaction
+        self.read_ratio = read_ratio                # Probability that an operation of a read-write transaction is a read
+        self.zipf_skew = zipf_skew                  # Zipf exponent of variable popularity (0 = uniform)
+        self.num_variables = num_variables
+        self.num_sites = num_sites
+        self.read_only_share = read_only_share      # Fraction of transactions that only read
+        self.failure_rate = failure_rate            # Probability that a site fails before any command
+        self.recovery_rate = recovery_rate          # Probability that a down site recovers before any command
+        self.dump = dump                            # Whether to end the trace with dump()
+        self.random = random.Random(seed)
+
+        # Variable x1 is the most popular, x2 the second most popular, and so on
+        self.variables = [f"x{rank}" for rank in range(1, num_variables + 1)]
+        self.cumulative_weights = list(accumulate(1 / (rank ** zipf_skew) for rank in range(1, num_variables + 1)))
+
+    def pick_variable(self):
+        return self.random.choices(self.variables, cum_weights = self.cumulative_weights)[0]
+
+    def generate(self):
+        """
+        Yield the lines of the trace.
+        """
+        rng = self.random
+        active = []         # [transaction_id, remaining operations, read only]
+        down_sites = []
+        begun = 0
+
+        while begun < self.transactions or active:
+            # Site failures and recoveries happen between commands
+            if down_sites and rng.random() < self.recovery_rate:
+                site_id = down_sites.pop(rng.randrange(len(down_sites)))
+                yield f"recover({site_id})"
+            if len(down_sites) < self.num_sites and rng.random() < self.failure_rate:
+                site_id = rng.choice([site for site in range(1, self.num_sites + 1) if site not in down_sites])
+                down_sites.append(site_id)
+                yield f"fail({site_id})"
+
+            if begun < self.transactions and ((len(active) < self.concurrency and rng.random() < 0.5) or not active):
+                begun += 1
+                length = max(1, round(rng.expovariate(1 / self.transaction_length)))
+                read_only = rng.random() < self.read_only_share
+                active.append([begun, length, read_only])
+                yield f"beginRO(T{begun})" if read_only else f"begin(T{begun})"
+                continue
+
+            entry = active[rng.randrange(len(active))]
+            transaction_id, remaining, read_only = entry
+            if remaining == 0:
+                active.remove(entry)
+                yield f"end(T{transaction_id})"
+            elif read_only or rng.random() < self.read_ratio:
+                entry[1] -= 1
+                yield f"R(T{transaction_id},{self.pick_variable()})"
+            else:
+                entry[1] -= 1
+                yield f"W(T{transaction_id},{self.pick_variable()},{rng.randrange(1000)})"
+
+        if self.dump:
+            yield "dump()"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description = "Generate a synthetic trace")
+    parser.add_argument("--output", default = "-", help = "File to write the trace to (default: stdout)")
+    parser.add_argument("--transactions", type = int, default = 1000, help = "Number of transactions")
+    parser.add_argument("--concurrency", type = int, default = 10, help = "Maximum concurrent transactions")
+    parser.add_argument("--length", type = float, default = 5, help = "Mean reads/writes per transaction")
+    parser.add_argument("--read-ratio", type = float, default = 0.7, help = "Fraction of operations that are reads")
+    parser.add_argument("--zipf", type = float, default = 0.0, help = "Zipf skew of variable accesses (0 = uniform)")
+    parser.add_argument("--variables", type = int, default = 20, help = "Number of variables")
+    parser.add_argument("--sites", type = int, default = 10, help = "Number of sites")
+    parser.add_argument("--read-only", type = float, default = 0.0, help = "Fraction of read-only transactions")
+    parser.add_argument("--failure-rate", type = float, default = 0.0, help = "Per-command site failure probability")
+    parser.add_argument("--recovery-rate", type = float, default = 0.2, help = "Per-command site recovery probability")
+    parser.add_argument("--no-dump", action = "store_true", help = "Do not end the trace with dump()")
+    parser.add_argument("--seed", type = int, default = 0, help = "Random seed")
+    args = parser.parse_args()
+
+    generator = WorkloadGenerator(
+        args.transactions, args.concurrency, args.length, args.read_ratio, args.zipf, args.variables, args.sites,
+        args.read_only, args.failure_rate, args.recovery_rate, not args.no_dump, args.seed
+    )
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        for line in generator.generate():
+            output.write(line + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
@@ -0,0 +1,150 @@
+"""
+-------------------------------------------------------------------------------
+Author(s): Rahi Krishna (rk4748), Tanmay G. Dadhania (tgd8275)
+Date: October 16, 2026
+
+Description:
+This file implements the write-ahead log that makes the state of a DataManager survive a process restart.
+Every site appends its writes, failures and recoveries to its own log file (site<N>.wal), one JSON record per line,
+numbered with a log sequence number (LSN). Records are buffered, and the commits of a group share one fsync (group
+commit): the log is forced to disk once group_size commits have accumulated, or earlier when the group has to be
+acknowledged. The TransactionManager forces every site's open group before its sink writes out any output, so a
+commit is never reported before its records are on disk, and a crash can only lose commits nobody was told
+about. A burst of commits reported together still shares one fsync per site. Every checkpoint_interval records
+the site's whole state is written to site<N>.ckpt and the log is started afresh, so a restart loads the checkpoint
+and replays only the records logged after it. Records with an LSN already covered by the checkpoint are skipped,
+which makes a crash between writing a checkpoint and truncating the log harmless.
+-------------------------------------------------------------------------------
+"""
+
+import os
+import json
+
+
+class WriteAheadLog:
+    def __init__(self, directory, site_id, group_size=32, checkpoint_interval=10000):
+        if group_size < 1 or checkpoint_interval < 1:
+            raise Exception("Group size and checkpoint interval must be at least 1.")
+
+        self.directory = directory
+        self.group_size = group_size                    # Commits that share one fsync
+        self.checkpoint_interval = checkpoint_interval  # Records logged between checkpoints
+        self.log_path = os.path.join(directory, f"site{site_id}.wal")
+        self.checkpoint_path = os.path.join(directory, f"site{site_id}.ckpt")
+
+        self.lsn = 0                        # LSN of the last record appended
+        self.unsynced_commits = 0           # Commits appended since the last fsync
+        self.records_since_checkpoint = 0
+        self.stats = {"records": 0, "commits": 0, "syncs": 0, "checkpoints": 0}
+
+        os.makedirs(directory, exist_ok = True)
+        self.file = None
+
+    def load(self):
+        """
+        Return the last checkpointed state (or None) and the log records written after it, in LSN order.
+        A record cut short by a crash ends the log; it is cut off the file before new records are appended, so they
+        start on a line of their own.
+        """
+        state = None
+        checkpoint_lsn = 0
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as checkpoint_file:
+                state = json.load(checkpoint_file)
+            checkpoint_lsn = state["lsn"]
+
+        records = []
+        if os.path.exists(self.log_path):
+            valid_length = 0  # Bytes of the log up to the end of its last complete record
+            with open(self.log_path, "rb") as log_file:
+                for line in log_file:
+                    if not line.endswith(b"\n"):
+                        break  # Torn tail of the last write before a crash
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # A garbled record ends the log as well
+                    valid_length += len(line)
+                    if record[0] > checkpoint_lsn:
+                        records.append(record)
+            if valid_length < os.path.getsize(self.log_path):
+                with open(self.log_path, "r+b") as log_file:
+                    log_file.truncate(valid_length)
+                    log_file.flush()
+                    os.fsync(log_file.fileno())
+
+        self.lsn = records[-1][0] if records else checkpoint_lsn
+        self.records_since_checkpoint = len(records)
+        self.file = open(self.log_path, "a")
+        return state, records
+
+    def append(self, *record):
+        """
+        Buffer one record; it reaches the disk at the next sync.
+        """
+        self.lsn += 1
+        self.records_since_checkpoint += 1
+        self.stats["records"] += 1
+        self.file.write(json.dumps([self.lsn, *record], separators = (",", ":")) + "\n")
+
+    def commit(self):
+        """
+        Mark the end of a transaction's records, syncing once group_size commits have accumulated.
+        """
+        self.stats["commits"] += 1
+        self.unsynced_commits += 1
+        if self.unsynced_commits >= self.group_size:
+            self.sync()
+
+    def sync_group(self):
+        """
+        Force the open group of commits to disk, if it has any, so they can be acknowledged.
+        """
+        if self.unsynced_commits:
+            self.sync()
+
+    def sync(self):
+        """
+        Force every buffered record to disk.
+        """
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.unsynced_commits = 0
+        self.stats["syncs"] += 1
+
+    def needs_checkpoint(self):
+        return self.records_since_checkpoint >= self.checkpoint_interval
+
+    def checkpoint(self, state):
+        """
+        Durably replace the checkpoint with the given state, then start an empty log.
+        """
+        self.sync()
+        state["lsn"] = self.lsn
+        temporary_path = self.checkpoint_path + ".tmp"
+        with open(temporary_path, "w") as checkpoint_file:
+            json.dump(state, checkpoint_file, separators = (",", ":"))
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temporary_path, self.checkpoint_path)
+        self.sync_directory()  # The rename itself must survive a crash
+
+        self.file.close()
+        self.file = open(self.log_path, "w")
+        self.records_since_checkpoint = 0
+        self.stats["checkpoints"] += 1
+
+    def sync_directory(self):
+        """
+        Force the log directory's entries, such as a renamed checkpoint, to disk.
+        """
+        descriptor = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+    def close(self):
+        if self.file is not None and not self.file.closed:
+            self.sync()
+            self.file.close()
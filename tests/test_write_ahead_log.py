@@ -0,0 +1,90 @@
+"""
+-------------------------------------------------------------------------------
+Author(s): Rahi Krishna (rk4748), Tanmay G. Dadhania (tgd8275)
+Date: October 17, 2026
+
+Description:
+Restart tests of the write-ahead log. Each test runs Main.py several times on one log directory, the way a site
+is restarted after a crash, and checks what the restarted sites hold. The server test checks that a commit is only
+reported to a client once it is on disk. Run them from the repository root with `python -m unittest discover tests`.
+-------------------------------------------------------------------------------
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPOSITORY)
+
+from Server import TransactionServer
+from TransactionManager import TransactionManager
+
+
+class WriteAheadLogRestartTest(unittest.TestCase):
+    def setUp(self):
+        self.wal_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.wal_dir)
+
+    def run_trace(self, *commands):
+        """
+        Run the commands as a trace with logs in the test's directory and return what it printed.
+        """
+        result = subprocess.run([sys.executable, os.path.join(REPOSITORY, "Main.py"), "-", "--wal-dir", self.wal_dir],
+                                input = "\n".join(commands) + "\n", capture_output = True, text = True, check = True)
+        self.assertEqual(result.stderr, "")
+        return result.stdout
+
+    def test_commit_after_torn_tail_survives_restarts(self):
+        # x3 lives on site 4 only
+        self.run_trace("begin(T1)", "W(T1, x3, 33)", "end(T1)")
+
+        # A crash cut the last record short
+        with open(os.path.join(self.wal_dir, "site4.wal"), "a") as log_file:
+            log_file.write('[99,"W","x3",')
+
+        output = self.run_trace("begin(T2)", "W(T2, x3, 77)", "end(T2)")
+        self.assertIn("Transaction T2 has been committed.", output)
+
+        # The acknowledged commit is there after a restart, and after another one
+        for _ in range(2):
+            self.assertIn("site 4 – x3: 77\n", self.run_trace("dump(x3)"))
+
+
+class ServerWriteAheadLogTest(unittest.TestCase):
+    class LogCheckingStream:
+        """
+        Stream that records, for every write, the commits site 4 has logged but not yet forced to disk.
+        """
+
+        def __init__(self, site):
+            self.site = site
+            self.unsynced = []
+
+        def write(self, text):
+            self.unsynced.append((text, self.site.wal.unsynced_commits))
+
+    def setUp(self):
+        self.wal_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.wal_dir)
+
+    def test_commit_is_on_disk_before_it_is_reported(self):
+        transaction_manager = TransactionManager(wal_options = {"directory": self.wal_dir, "group_size": 32})
+        server = TransactionServer(transaction_manager)
+        stream = self.LogCheckingStream(transaction_manager.sites[4])
+        try:
+            server.replay(["alice: begin(T1)", "alice: W(T1, x3, 33)", "alice: end(T1)"], stream)
+        finally:
+            transaction_manager.close()
+        self.assertIn(("alice> Transaction T1 has been committed.\n", 0), stream.unsynced)
+
+
+if __name__ == "__main__":
+    unittest.main()